@@ -16,27 +16,76 @@ Output Configuration:
   
   When --output_dir is specified, the script will create the directory if it doesn't exist,
   and all output files will be written there, preserving their original filenames.
+
+Argument Files:
+  Arguments can also be read from a file by passing its path prefixed with '@'.
+  The file uses shell-style quoting and may contain blank lines and # comments:
+
+  python gemini_generator.py @project.args --output_dir "./output"
 """
 
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
 import json
 import os
 import sys
 import logging
+import random
+import re
+import shlex
+import threading
+import time
 import traceback
-import urllib.parse
+import weakref
 import argparse
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_for_futures
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
-from typing import Dict, Any, List, Optional, Type, Callable
-import requests  # For GitHub API requests
-from jinja2 import Template, FileSystemLoader, Environment
+from typing import Dict, Any, Generator, List, NamedTuple, Optional, Tuple, Type, Callable, Union
+from jinja2 import Template, FileSystemLoader, Environment, FileSystemBytecodeCache
+from jinja2.environment import TemplateStream
 from models import *  # Import your models from the models module
 
-import google.generativeai as genai
 from pydantic import BaseModel, Field, ValidationError
-from pydantic_ai import Agent, RunContext, ModelRetry
-from pydantic_ai.models.gemini import GeminiModelSettings
-from google.genai.types import Tool, GenerateContentConfig, GoogleSearch
+
+try:
+    import orjson  # Optional: much faster JSON encoding for the output files
+except ImportError:
+    orjson = None
+
+# Gemini SDK modules are imported on first use by _load_gemini_sdk(), so that
+# --help, output writing and template rendering don't pay for importing them.
+genai = None
+google_exceptions = None
+Agent = None
+RunContext = None
+GeminiModelSettings = None
+UnexpectedModelBehavior = None
+
+# API key genai was last configured with by CommonGeminiTools.configure_api().
+_CONFIGURED_API_KEY: Optional[str] = None
+
+
+def _load_gemini_sdk() -> None:
+    """Imports google.generativeai and pydantic-ai into the module namespace, once."""
+    global genai, google_exceptions, Agent, RunContext, GeminiModelSettings, UnexpectedModelBehavior
+    if genai is not None:
+        return
+    import google.generativeai as _genai
+    from google.api_core import exceptions as _google_exceptions
+    from pydantic_ai import Agent as _Agent, RunContext as _RunContext
+    from pydantic_ai.exceptions import UnexpectedModelBehavior as _UnexpectedModelBehavior
+    from pydantic_ai.models.gemini import GeminiModelSettings as _GeminiModelSettings
+    google_exceptions = _google_exceptions
+    Agent, RunContext, GeminiModelSettings = _Agent, _RunContext, _GeminiModelSettings
+    UnexpectedModelBehavior = _UnexpectedModelBehavior
+    genai = _genai
 
 # SYMBOL MAP
 # ----------
@@ -67,6 +116,8 @@ from google.genai.types import Tool, GenerateContentConfig, GoogleSearch
 #   ProjectPromptsFormatter.format_simple_project_prompt: Formats the basic project prompt.
 #   OutputFileWriter.write_markdown_output: Writes the main markdown output file.
 #   OutputFileWriter.write_error_markdown: Writes error information to the markdown file.
+#   OutputFileWriter.write_all_outputs: Writes the JSON and markdown output files.
+#   OutputFileWriter.write_error_outputs: Writes error information to the JSON and markdown files.
 #   ProjectPrompt._generate_all_content: Runs the full content generation pipeline.
 #
 # Global Variables:
@@ -82,28 +133,639 @@ from google.genai.types import Tool, GenerateContentConfig, GoogleSearch
 #   CopilotPromptContent: Output model for structured Copilot instructions content.
 
 
-# Set up logging
+# Set up logging; handlers are attached lazily by _configure_logging() so that
+# importing this module has no side effects. Until then records go to a NullHandler
+# rather than logging's last-resort stderr handler.
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+logger.addHandler(logging.NullHandler())
+_LOGGING_CONFIGURED = False
 
-# File Handler
-file_handler = logging.FileHandler('gemini_generator.log')
-file_handler.setLevel(logging.INFO)
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
 
-# Console Handler
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+def _configure_logging() -> None:
+    """
+    Attaches the file and console handlers to the module logger, once.
+    Logs at INFO level, or at DEBUG level when GEMINI_DEBUG is set.
+    """
+    global _LOGGING_CONFIGURED
+    if _LOGGING_CONFIGURED:
+        return
+    _LOGGING_CONFIGURED = True
+    level = logging.DEBUG if _env("GEMINI_DEBUG") else logging.INFO
+    logger.setLevel(level)
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+    # File Handler
+    file_handler = logging.FileHandler('gemini_generator.log')
+    file_handler.setLevel(level)
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+    # Console Handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(level)
+    console_handler.setFormatter(formatter)
+    logger.addHandler(console_handler)
+
+
+# Environment variables read by main(), memoized so that repeated in-process
+# invocations (tests, batch wrappers) don't re-read os.environ.
+_ENV_CACHE: Dict[str, Optional[str]] = {}
+_MISSING = object()
+
+
+def _env(name: str) -> Optional[str]:
+    """
+    Returns the value of an environment variable, reading it once per process.
+
+    Args:
+        name: Name of the environment variable.
+
+    Returns:
+        The variable's value, or None if it is not set.
+    """
+    value = _ENV_CACHE.get(name, _MISSING)
+    if value is not _MISSING:
+        return value
+    return _ENV_CACHE.setdefault(name, os.environ.get(name))
+
+
+# $VAR and ${VAR} references, as understood by os.path.expandvars.
+_VAR_RE = re.compile(r'\$(\w+)|\$\{([^}]+)\}')
+
+
+def _expandvars_cached(value: str) -> str:
+    """
+    Expands $VAR and ${VAR} references using the memoized environment.
+    Unknown variables are left unchanged, as with os.path.expandvars.
+
+    Args:
+        value: String that may contain environment variable references.
+
+    Returns:
+        The string with known variables substituted.
+    """
+    def _substitute(match: re.Match) -> str:
+        expanded = _env(match.group(1) or match.group(2))
+        return match.group(0) if expanded is None else expanded
+    return _VAR_RE.sub(_substitute, value)
 
 
 # Set up Jinja2 template environment
 template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
 template_loader = FileSystemLoader(searchpath=template_dir)
-template_env = Environment(loader=template_loader)
+_MAIN_TEMPLATE_PATH = os.path.join(template_dir, "project_prompt_template.j2")
+
+
+class _LazyFileSystemBytecodeCache(FileSystemBytecodeCache):
+    """
+    FileSystemBytecodeCache that resolves, and if needed creates, its directory
+    the first time a template is compiled rather than when it is constructed,
+    so importing this module touches no directories. Without an explicit
+    directory it uses Jinja2's default per-user cache directory, whose
+    ownership and permissions Jinja2 verifies.
+    """
+    def __init__(self, directory: Optional[str] = None, pattern: str = "__jinja2_%s.cache"):
+        self._directory = directory
+        self.pattern = pattern
+
+    @functools.cached_property
+    def directory(self) -> str:
+        if self._directory is None:
+            return self._get_default_cache_dir()
+        os.makedirs(self._directory, mode=0o700, exist_ok=True)
+        return self._directory
+
+
+# Persist compiled template bytecode between CLI runs; templates ship with the package, so skip reload checks.
+# TF_PROMPT_JINJA_CACHE_DIR lets CI share a primed cache between invocations.
+template_env = Environment(
+    loader=template_loader,
+    bytecode_cache=_LazyFileSystemBytecodeCache(_env("TF_PROMPT_JINJA_CACHE_DIR")),
+    auto_reload=False
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_template_file(path: str) -> str:
+    """
+    Reads a template file once per process.
+
+    Args:
+        path: Path to the template file.
+
+    Returns:
+        The file contents.
+    """
+    return Path(path).read_text(encoding="utf-8")
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_template(source: str) -> Template:
+    """
+    Compiles a template source string with `template_env`, sharing one
+    compiled template between identical sources.
+
+    Args:
+        source: The Jinja2 template source.
+
+    Returns:
+        The compiled Jinja2 template.
+    """
+    return template_env.from_string(source)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_template(path: str) -> Template:
+    """
+    Loads and compiles a Jinja2 template file once per process, so that every
+    generator instance using the same file shares the parsed template.
+    Templates shipped in `template_dir` go through `template_env`'s loader so
+    they also benefit from the on-disk bytecode cache.
+
+    Args:
+        path: Path to the template file.
+
+    Returns:
+        The compiled Jinja2 template.
+    """
+    relative_path = os.path.relpath(os.path.abspath(path), template_dir)
+    if not relative_path.startswith(os.pardir):
+        return template_env.get_template(Path(relative_path).as_posix())
+    return _compile_template(_load_template_file(path))
+
+
+def _markdown_list_section(items: Optional[List[Any]], empty_message: str) -> str:
+    """Renders one list section of the bundled markdown template."""
+    if items:
+        return "\n" + "".join(f"\n- {item}\n" for item in items) + "\n"
+    return f"\n{empty_message}\n"
+
+
+def _build_project_markdown(data: Dict[str, Any]) -> str:
+    """
+    Builds the markdown document produced by project_prompt_template.j2
+    directly with string formatting, without going through Jinja2.
+
+    Args:
+        data: The template data, as returned by OutputFileWriter._markdown_template_data.
+
+    Returns:
+        The markdown document.
+    """
+    best_practices = _markdown_list_section(data.get("best_practices"), "No best practices provided.")
+    documentation = _markdown_list_section(data.get("documentation_source"), "No documentation sources provided.")
+    return (f"# Project Prompt\n{data.get('readme_content', '')}\n\n"
+            f"## Best Practices\n{best_practices}\n\n"
+            f"## Documentation Sources\n{documentation}")
+
+
+@functools.lru_cache(maxsize=1)
+def _markdown_template_is_trivial() -> bool:
+    """
+    Checks, once per process, that _build_project_markdown reproduces the
+    bundled markdown template exactly, by rendering both with sentinel data.
+    If the template file has been edited, the check fails and callers keep
+    rendering it with Jinja2.
+
+    Returns:
+        True if the direct build matches the template output.
+    """
+    # Every field the writer passes to the template (OutputFileWriter.MARKDOWN_FIELDS) is
+    # filled, so a template section using any of them makes the check fail.
+    samples = (
+        {"readme_content": "\x00readme\x00", "best_practices": ["\x00bp1\x00", "\x00bp2\x00"],
+         "suggested_extensions": ["\x00ext\x00"], "documentation_source": ["\x00doc\x00"],
+         "copilot_instructions": "\x00copilot\x00"},
+        {"readme_content": "\x00readme\x00", "best_practices": [], "suggested_extensions": [],
+         "documentation_source": [], "copilot_instructions": ""},
+        {"readme_content": "\x00readme\x00"},
+    )
+    try:
+        template = _get_template(_MAIN_TEMPLATE_PATH)
+        return all(template.render(sample) == _build_project_markdown(sample) for sample in samples)
+    except Exception as e:
+        logger.debug("Markdown template check failed, rendering with Jinja2: %s", e)
+        return False
+
+
+@dataclass(slots=True, frozen=True)
+class ModelCapabilities:
+    """Generation parameter defaults and limits for a Gemini model."""
+    temperature: float
+    top_p: float
+    top_k: int
+    max_output_tokens: int
+    candidate_count: int
+    max_temperature: float
+
+
+# max_output_tokens used when none is given. Generated documentation stays well
+# below this, and a lower cap bounds the worst-case decode time of a runaway
+# response. Explicit values are only limited by the model's own output limit.
+DEFAULT_MAX_OUTPUT_TOKENS = 8192
+
+# Used when a model's details cannot be looked up.
+DEFAULT_MODEL_CAPABILITIES = ModelCapabilities(
+    temperature=0.2, top_p=0.95, top_k=32, max_output_tokens=4096, candidate_count=1, max_temperature=2.0
+)
+
+
+class _ModelEntry(NamedTuple):
+    """The fields of a `genai.list_models()` descriptor that this module uses."""
+    name: str
+    output_token_limit: int
+    temperature: float
+    max_temperature: float
+    top_p: float
+    top_k: int
+    supported_generation_methods: Tuple[str, ...]
+
+
+@functools.lru_cache(maxsize=1)
+def _cached_list_models() -> Tuple[_ModelEntry, ...]:
+    """
+    Fetches the Gemini model catalogue once per process. Failed fetches are
+    not cached, so the next call tries again.
+
+    Returns:
+        The available models as _ModelEntry tuples.
+    """
+    _load_gemini_sdk()
+    logger.info("Fetching list of available models from Gemini API...")
+    return tuple(
+        _ModelEntry(
+            name=model.name,
+            output_token_limit=getattr(model, 'output_token_limit', 4096),
+            temperature=getattr(model, 'temperature', 1.0),
+            max_temperature=getattr(model, 'max_temperature', 2.0),
+            top_p=getattr(model, 'top_p', 0.95),
+            top_k=getattr(model, 'top_k', 40),
+            supported_generation_methods=tuple(getattr(model, 'supported_generation_methods', ()))
+        )
+        for model in genai.list_models()
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _content_model_names() -> Tuple[str, ...]:
+    """
+    Returns the names, without the "models/" prefix, of the catalogue models
+    that support content generation, in catalogue order. Built once per
+    fetched catalogue.
+    """
+    return tuple(
+        model.name.replace("models/", "")
+        for model in _cached_list_models()
+        if 'generateContent' in model.supported_generation_methods
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _content_model_name_set() -> frozenset[str]:
+    """Returns _content_model_names() as a set, for constant-time availability checks."""
+    return frozenset(_content_model_names())
+
+
+@functools.lru_cache(maxsize=32)
+def _model_capabilities(model_name: str) -> ModelCapabilities:
+    """
+    Derives generation defaults and limits for a model from the cached catalogue.
+
+    Args:
+        model_name: The model name without the "models/" prefix.
+
+    Returns:
+        The model's ModelCapabilities, or DEFAULT_MODEL_CAPABILITIES if the
+        model is not in the catalogue.
+    """
+    model_info = next((m for m in _cached_list_models() if m.name.endswith(model_name)), None)
+    if model_info is None:
+        logger.warning("Could not find details for model %s, using conservative defaults", model_name)
+        return DEFAULT_MODEL_CAPABILITIES
+    logger.info("Found model details for %s", model_name)
+
+    max_temp = model_info.max_temperature
+    if max_temp is None: max_temp = 2.0
+    logger.info("Model limits: output_tokens=%s, max_temp=%s, top_p=%s, top_k=%s", model_info.output_token_limit, max_temp, model_info.top_p, model_info.top_k)
+
+    return ModelCapabilities(
+        temperature=min(0.2, max_temp),
+        top_p=model_info.top_p,
+        top_k=model_info.top_k,
+        max_output_tokens=model_info.output_token_limit,
+        candidate_count=1,
+        max_temperature=max_temp
+    )
+
+
+# Prefixes that name the same Gemini model: pydantic-ai's provider prefix and the API resource prefix.
+_MODEL_NAME_PREFIXES = ("google-gla:", "models/")
+
+
+def _normalize_model_name(name: str) -> str:
+    """
+    Strips the pydantic-ai provider prefix and the "models/" resource prefix
+    from a model name, so "google-gla:gemini-1.5-pro", "models/gemini-1.5-pro"
+    and "gemini-1.5-pro" resolve, and are cached, as the same model.
+
+    Args:
+        name: A Gemini model name, with or without prefixes.
+
+    Returns:
+        The bare model name.
+    """
+    for prefix in _MODEL_NAME_PREFIXES:
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+    return name
+
+
+def _model_bucket(name: str) -> int:
+    """Returns the fallback priority bucket of a model name: pro models first, then flash, then the rest."""
+    return 0 if "pro" in name else (1 if "flash" in name else 2)
+
+
+# Token config keys that are passed on to GeminiModelSettings.
+_GEMINI_SETTING_KEYS: frozenset[str] = frozenset({
+    "temperature", "top_p", "top_k", "max_output_tokens", "candidate_count"
+})
+
+# (field, lower bound, upper bound, replacement for out-of-range values) for token
+# config validation. A string names the ModelCapabilities attribute holding the
+# model's own value; a None replacement clamps to the nearest bound.
+_FIELD_BOUNDS = (
+    ("temperature", 0.0, "max_temperature", None),
+    ("top_p", 0.0, 1.0, "top_p"),
+    ("top_k", 1, None, "top_k"),
+    ("max_output_tokens", 1, "max_output_tokens", "max_output_tokens"),
+)
+
+# Agents keyed by everything that goes into building them, shared across ProjectPrompt instances.
+_AGENT_CACHE: Dict[tuple, Agent] = {}
+
+# User prompt sent to the main content agent.
+MAIN_CONTENT_PROMPT = "Generate comprehensive documentation and project setup guidance with current best practices."
+
+
+@contextmanager
+def _atomic_open(file_path: Union[str, Path], mode: str = "wb", **kwargs):
+    """
+    Opens a temporary file next to `file_path` for writing and, once the block
+    completes, flushes it to disk and renames it over `file_path`. Readers never
+    see a partially written file, and on failure the original file is left
+    untouched and the temporary file is removed. If `file_path` is a symlink,
+    its target is replaced, and the file keeps the permissions of the file it
+    replaces, or gets the umask's default permissions if it is new.
+
+    Args:
+        file_path: Final path of the file.
+        mode: File mode for the temporary file ("wb" or "w").
+        **kwargs: Passed on to open() (e.g. encoding).
+    """
+    file_path = os.path.realpath(file_path)
+    directory, name = os.path.split(file_path)
+    tmp_path = os.path.join(directory, f".{name}.{os.urandom(8).hex()}.tmp")
+    # Created 0666 so the kernel applies the umask, as for a plain open(); os.replace
+    # keeps the temporary file's mode.
+    fd = os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+    try:
+        with os.fdopen(fd, mode, **kwargs) as tmp_file:
+            try:
+                os.chmod(tmp_path, os.stat(file_path).st_mode & 0o7777)
+            except FileNotFoundError:
+                pass
+            yield tmp_file
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@functools.lru_cache(maxsize=1)
+def _output_write_executor() -> ThreadPoolExecutor:
+    """The thread pool shared by every OutputFileWriter, created on first use."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="output-write")
+
+
+# On-disk cache of generated ProjectOutput responses, shared between working
+# directories. GEMINI_CACHE_DIR moves it and GEMINI_CACHE_TTL (seconds) expires
+# old entries. Bump the version when the prompt handling or the ProjectOutput
+# schema changes to invalidate old entries.
+RESPONSE_CACHE_VERSION = 1
+
+
+@functools.lru_cache(maxsize=1)
+def _response_cache_dir() -> Path:
+    """
+    Returns the response cache directory: GEMINI_CACHE_DIR if set, otherwise
+    terraform-gemini under XDG_CACHE_HOME or ~/.cache. Resolved on first use
+    rather than at import, so the module loads even where no home directory
+    can be determined, and is never resolved when caching is disabled.
+
+    Raises:
+        RuntimeError: If no directory is configured and the home directory is unknown.
+    """
+    configured = _env("GEMINI_CACHE_DIR")
+    if configured:
+        return Path(configured).expanduser()
+    xdg_cache_home = _env("XDG_CACHE_HOME")
+    # The XDG spec says relative paths are invalid and should be ignored.
+    if xdg_cache_home and os.path.isabs(xdg_cache_home):
+        return Path(xdg_cache_home) / "terraform-gemini"
+    return Path.home() / ".cache" / "terraform-gemini"
+
+
+def _response_cache_key(project_info: ProjectInfo, model_name: str, token_config: Dict[str, Any],
+                        system_prompt_str: str, context_template_str: str,
+                        placeholders: Optional[Dict[str, str]] = None) -> str:
+    """
+    Hashes every input that affects a main content response into a cache key.
+
+    Returns:
+        A hex digest identifying the request.
+    """
+    payload = json.dumps({
+        "version": RESPONSE_CACHE_VERSION,
+        "project": project_info.model_dump(),
+        "model": model_name,
+        "token_config": token_config,
+        "system_prompt": system_prompt_str,
+        "context_template": context_template_str,
+        "placeholders": placeholders or {},
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _response_cache_enabled() -> bool:
+    """Returns False when GEMINI_CACHE_DISABLE=1 is set."""
+    return _env("GEMINI_CACHE_DISABLE") != "1"
+
+
+def _response_cache_ttl() -> Optional[float]:
+    """
+    Returns the maximum age of a response cache entry in seconds, from
+    GEMINI_CACHE_TTL, or None if entries never expire.
+    """
+    ttl = _env("GEMINI_CACHE_TTL")
+    if not ttl:
+        return None
+    try:
+        return float(ttl)
+    except ValueError:
+        logger.warning("Ignoring invalid GEMINI_CACHE_TTL value: %s", ttl)
+        return None
+
+
+def _read_cached_output(key: str) -> Optional[ProjectOutput]:
+    """
+    Loads a previously generated ProjectOutput from the response cache.
+
+    Args:
+        key: Cache key from _response_cache_key().
+
+    Returns:
+        The cached output, or None on a miss or an unreadable entry.
+    """
+    cache_file = None
+    try:
+        cache_file = _response_cache_dir() / f"{key}.json"
+        ttl = _response_cache_ttl()
+        if ttl is not None and time.time() - cache_file.stat().st_mtime > ttl:
+            logger.info("Response cache entry %s has expired.", cache_file)
+            return None
+        return ProjectOutput.model_validate_json(cache_file.read_bytes())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable response cache entry %s: %s", cache_file or key, e)
+        return None
+
+
+def _write_cached_output(key: str, output_data: ProjectOutput) -> None:
+    """
+    Stores a generated ProjectOutput in the response cache. The entry is written
+    atomically so readers never see a partial entry.
+
+    Args:
+        key: Cache key from _response_cache_key().
+        output_data: The successfully generated output.
+    """
+    try:
+        cache_dir = _response_cache_dir()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with _atomic_open(cache_dir / f"{key}.json") as cache_file:
+            cache_file.write(output_data.model_dump_json().encode("utf-8"))
+    except Exception as e:
+        logger.warning("Failed to write response cache entry: %s", e)
+
+
+class GeminiRateLimiter:
+    """
+    Bounds the number of Gemini requests in flight and paces them to
+    requests-per-minute and tokens-per-minute budgets, so that runs over many
+    projects stay within quota instead of tripping 429s and backing off.
+    Token costs are estimated by the caller and reserved before the request is sent.
+    """
+    WINDOW_SECONDS = 60.0
+    DEFAULT_MAX_CONCURRENT = 4
+
+    def __init__(self, max_concurrent: Optional[int] = None, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        """
+        Initializes the rate limiter. Unset limits are read from the
+        GEMINI_MAX_CONCURRENT, GEMINI_RPM and GEMINI_TPM environment variables;
+        an RPM or TPM budget of 0 disables that limit.
+
+        Args:
+            max_concurrent: Maximum number of requests in flight (default 4).
+                            Values below 1 are ignored with a warning.
+            rpm: Maximum number of requests started per minute.
+            tpm: Maximum number of estimated tokens sent per minute.
+        """
+        if max_concurrent is None:
+            max_concurrent = int(_env("GEMINI_MAX_CONCURRENT") or self.DEFAULT_MAX_CONCURRENT)
+        if max_concurrent < 1:
+            # A zero-sized semaphore would block the first request forever.
+            logger.warning("Ignoring max concurrent requests of %s; it must be at least 1, using %s.",
+                           max_concurrent, self.DEFAULT_MAX_CONCURRENT)
+            max_concurrent = self.DEFAULT_MAX_CONCURRENT
+        self.max_concurrent = max_concurrent
+        self.rpm = rpm if rpm is not None else int(_env("GEMINI_RPM") or 0)
+        self.tpm = tpm if tpm is not None else int(_env("GEMINI_TPM") or 0)
+        self._lock = threading.Lock()
+        self._window: deque = deque()  # (start time, estimated tokens) of requests in the last minute
+        self._window_tokens = 0
+        self._thread_semaphore = threading.BoundedSemaphore(self.max_concurrent)
+        # asyncio semaphores are bound to an event loop, and each asyncio.run() uses a new one.
+        self._loop_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    def _reserve(self, tokens: int) -> float:
+        """
+        Records a request starting now if the per-minute budgets allow it.
+
+        Args:
+            tokens: Estimated token cost of the request.
+
+        Returns:
+            0 if the request was recorded, otherwise the seconds to wait before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0][0] >= self.WINDOW_SECONDS:
+                self._window_tokens -= self._window.popleft()[1]
+
+            wait = 0.0
+            if self.rpm and len(self._window) >= self.rpm:
+                wait = self._window[0][0] + self.WINDOW_SECONDS - now
+            if self.tpm and self._window and self._window_tokens + tokens > self.tpm:
+                freed = self._window_tokens
+                for started, used in self._window:
+                    freed -= used
+                    if freed + tokens <= self.tpm:
+                        wait = max(wait, started + self.WINDOW_SECONDS - now)
+                        break
+                else:
+                    # Larger than the whole budget: wait for an empty window.
+                    wait = max(wait, self._window[-1][0] + self.WINDOW_SECONDS - now)
+            if wait > 0:
+                return wait
+
+            self._window.append((now, tokens))
+            self._window_tokens += tokens
+            return 0.0
+
+    @contextmanager
+    def limit(self, tokens: int = 0):
+        """Holds a request slot for a blocking Gemini call, waiting for budget first."""
+        with self._thread_semaphore:
+            while (wait := self._reserve(tokens)) > 0:
+                logger.info("Gemini rate budget exhausted, waiting %.1fs", wait)
+                time.sleep(wait)
+            yield
+
+    @asynccontextmanager
+    async def limit_async(self, tokens: int = 0):
+        """Holds a request slot for a Gemini coroutine, waiting for budget first."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._loop_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._loop_semaphores[loop] = asyncio.Semaphore(self.max_concurrent)
+        async with semaphore:
+            while (wait := self._reserve(tokens)) > 0:
+                logger.info("Gemini rate budget exhausted, waiting %.1fs", wait)
+                await asyncio.sleep(wait)
+            yield
+
+
+@functools.lru_cache(maxsize=1)
+def _default_rate_limiter() -> GeminiRateLimiter:
+    """Returns the process-wide rate limiter configured from the environment."""
+    return GeminiRateLimiter()
+
 
 class CommonGeminiTools:
     """
@@ -118,7 +780,10 @@ class CommonGeminiTools:
             api_key: Optional Gemini API key. If provided, configures the API.
             enable_search_grounding: Flag to enable/disable search grounding features.
         """
+        _load_gemini_sdk()
         self.enable_search_grounding = enable_search_grounding
+        self._available_model_cache: Dict[str, str] = {}
+        self._resolved_capabilities: Dict[str, ModelCapabilities] = {}
         if api_key:
             self.configure_api(api_key)
 
@@ -135,16 +800,84 @@ class CommonGeminiTools:
         if not api_key:
             logger.error("Gemini API key not provided for configuration.")
             return False
+        global _CONFIGURED_API_KEY
         try:
-            genai.configure(api_key=api_key)
+            # The SDK configuration is process-wide; only redo it when the key changes.
+            if api_key != _CONFIGURED_API_KEY:
+                genai.configure(api_key=api_key)
+                _CONFIGURED_API_KEY = api_key
             self.get_available_model()
             logger.info("Gemini API configured and connection successful.")
             return True
         except Exception as e:
-            logger.error(f"Gemini API configuration or connection test failed: {str(e)}")
+            logger.error("Gemini API configuration or connection test failed: %s", e)
             return False
 
-    def get_model_details(self, model_name: str) -> Dict[str, Any]:
+    @staticmethod
+    def _is_rate_limit_error(e: Exception) -> bool:
+        """Returns True if the exception is a Gemini quota/rate-limit (HTTP 429) error."""
+        return isinstance(e, google_exceptions.ResourceExhausted) or getattr(e, 'status_code', None) == 429
+
+    @staticmethod
+    def _backoff_delay(e: Exception, attempt: int, base: float) -> float:
+        """
+        Computes how long to wait before retrying a rate-limited call, preferring
+        the server-provided retry delay when the error carries one.
+        """
+        retry_infos = [e] + list(getattr(e, 'details', None) or [])
+        for info in retry_infos:
+            seconds = getattr(getattr(info, 'retry_delay', None), 'seconds', None)
+            if seconds:
+                return float(seconds)
+        return base * 2 ** attempt + random.uniform(0, base)
+
+    def _gemini_call_with_backoff(self, fn: Callable[..., Any], *args,
+                                  max_attempts: int = 5, base: float = 1.0, **kwargs) -> Any:
+        """
+        Calls `fn`, retrying with exponential backoff while Gemini reports rate limiting.
+
+        Args:
+            fn: The callable issuing the Gemini request.
+            max_attempts: Maximum number of attempts before the error is re-raised.
+            base: Base delay in seconds for the exponential backoff.
+
+        Returns:
+            The return value of `fn`.
+        """
+        for attempt in range(max_attempts):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not self._is_rate_limit_error(e) or attempt == max_attempts - 1:
+                    raise
+                delay = self._backoff_delay(e, attempt, base)
+                logger.warning("Gemini rate limit hit, retrying in %.1fs (attempt %s/%s): %s", delay, attempt + 1, max_attempts, e)
+                time.sleep(delay)
+
+    async def _gemini_call_with_backoff_async(self, fn: Callable[..., Any], *args,
+                                              max_attempts: int = 5, base: float = 1.0, **kwargs) -> Any:
+        """Async counterpart of `_gemini_call_with_backoff` for coroutine functions."""
+        for attempt in range(max_attempts):
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if not self._is_rate_limit_error(e) or attempt == max_attempts - 1:
+                    raise
+                delay = self._backoff_delay(e, attempt, base)
+                logger.warning("Gemini rate limit hit, retrying in %.1fs (attempt %s/%s): %s", delay, attempt + 1, max_attempts, e)
+                await asyncio.sleep(delay)
+
+    def _list_models_cached(self) -> Tuple[_ModelEntry, ...]:
+        """
+        Returns the Gemini model catalogue, fetched once per process with
+        rate-limit backoff.
+
+        Returns:
+            The available models as _ModelEntry tuples.
+        """
+        return self._gemini_call_with_backoff(_cached_list_models)
+
+    def get_model_details(self, model_name: str) -> ModelCapabilities:
         """
         Retrieves details and capabilities for a given Gemini model name.
         Provides conservative defaults if the model is not found or details are missing.
@@ -153,96 +886,91 @@ class CommonGeminiTools:
             model_name: The name of the model (e.g., "gemini-1.5-pro").
 
         Returns:
-            A dictionary containing model parameters like temperature, top_p, top_k,
-            max_output_tokens, and candidate_count.
+            A ModelCapabilities instance with model parameters like temperature, top_p, top_k,
+            max_output_tokens, candidate_count and max_temperature.
         """
+        model_name = _normalize_model_name(model_name)
         try:
-            if model_name.startswith("models/"):
-                model_name = model_name[7:]
-            models = genai.list_models()
-            model_info = None
-            for model_obj in models:
-                if model_obj.name.endswith(model_name):
-                    model_info = model_obj
-                    logger.info(f"Found model details for {model_name}")
-                    break
-            if model_info is None:
-                logger.warning(f"Could not find details for model {model_name}, using conservative defaults")
-                return {"temperature": 0.2, "top_p": 0.95, "top_k": 32, "max_output_tokens": 4096, "candidate_count": 1}
-            
-            output_token_limit = getattr(model_info, 'output_token_limit', 4096)
-            default_temp = getattr(model_info, 'temperature', 1.0)
-            max_temp = getattr(model_info, 'max_temperature', 2.0)
-            if max_temp is None: max_temp = 2.0
-            default_top_p = getattr(model_info, 'top_p', 0.95)
-            default_top_k = getattr(model_info, 'top_k', 40)
-            
-            logger.info(f"Model limits: output_tokens={output_token_limit}, max_temp={max_temp}, top_p={default_top_p}, top_k={default_top_k}")
-            
-            return {
-                "temperature": min(0.2, max_temp if max_temp is not None else 0.2),
-                "top_p": default_top_p,
-                "top_k": default_top_k,
-                "max_output_tokens": min(16384, output_token_limit),
-                "candidate_count": 1,
-                "max_temperature": max_temp
-            }
+            self._list_models_cached()
+            return _model_capabilities(model_name)
         except Exception as e:
-            logger.warning(f"Error getting model details for {model_name}: {str(e)}, using conservative defaults")
-            return {"temperature": 0.2, "top_p": 0.95, "top_k": 32, "max_output_tokens": 4096, "candidate_count": 1}
+            logger.warning("Error getting model details for %s: %s, using conservative defaults", model_name, e)
+            return DEFAULT_MODEL_CAPABILITIES
 
     def get_available_model(self, requested_model: str = 'gemini-1.5-pro') -> str:
         """
         Finds an available Gemini model, trying the requested model first,
         then falling back to other available models based on a priority.
+        Availability is decided from the model catalogue returned by
+        `genai.list_models()`; no test inference calls are made.
 
         Args:
             requested_model: The preferred model name.
 
         Returns:
-            The name of a working, available Gemini model.
+            The name of an available Gemini model supporting content generation.
         """
+        requested_model = _normalize_model_name(requested_model)
+        if requested_model in self._available_model_cache:
+            return self._available_model_cache[requested_model]
         try:
-            logger.info(f"Trying requested model: {requested_model}")
-            model_to_test = genai.GenerativeModel(requested_model)
-            model_to_test.generate_content("Test")
-            logger.info(f"Successfully using requested model: {requested_model}")
-            return requested_model
-        except Exception as e:
-            logger.warning(f"Requested model {requested_model} not available or failed test: {str(e)}")
+            # Fetch (or reuse) the catalogue with backoff before deriving the name sets from it.
+            self._list_models_cached()
+            content_models = _content_model_names()
+            if requested_model in _content_model_name_set():
+                logger.info("Using requested model: %s", requested_model)
+                return self._remember_resolved_model(requested_model, requested_model)
+            logger.warning("Requested model %s is not available for content generation.", requested_model)
 
-        try:
-            logger.info("Fetching list of available models from Gemini API...")
-            available_models = genai.list_models()
-            content_models = [
-                model.name.replace("models/", "") 
-                for model in available_models 
-                if 'generateContent' in getattr(model, 'supported_generation_methods', [])
-            ]
             if not content_models:
                 logger.warning("No models supporting generateContent found, falling back to gemini-pro.")
                 return "gemini-pro"
 
-            sorted_models = sorted(content_models, key=lambda m: ("pro" not in m, "flash" not in m, m), reverse=False)
+            # Only the best candidate is needed, so select it in one pass instead of sorting.
+            fallback_model = min(content_models, key=lambda name: (_model_bucket(name), name))
             
-            logger.info(f"Available models sorted (simplified): {sorted_models[:5]} (showing top 5)")
-            for candidate in sorted_models:
-                try:
-                    logger.info(f"Trying candidate model: {candidate}")
-                    model_to_test = genai.GenerativeModel(candidate)
-                    model_to_test.generate_content("Test")
-                    logger.info(f"Successfully found working model: {candidate}")
-                    return candidate
-                except Exception as e_candidate:
-                    logger.warning(f"Candidate model {candidate} failed: {str(e_candidate)}")
-                    continue
+            logger.info("Using fallback model: %s (from %s available)", fallback_model, len(content_models))
+            return self._remember_resolved_model(requested_model, fallback_model)
         except Exception as e_list:
-            logger.error(f"Error getting available models: {str(e_list)}")
-        
-        logger.warning("All model attempts failed, using legacy gemini-pro as final attempt.")
-        return "gemini-pro"
+            logger.error("Error getting available models: %s", e_list)
+
+        # Without a catalogue there is nothing to check against; use the requested model
+        # as-is rather than spending test completions. It is not memoized, and a request
+        # that later fails because the model is unavailable invalidates the caches.
+        logger.warning("Could not verify model %s, using it unverified.", requested_model)
+        return requested_model
+
+    def _remember_resolved_model(self, requested_model: str, resolved_model: str) -> str:
+        """
+        Memoizes a model resolved from the catalogue, together with its
+        capabilities, so agent creation can validate settings without another lookup.
+
+        Returns:
+            The resolved model name.
+        """
+        self._available_model_cache[requested_model] = resolved_model
+        self._resolved_capabilities[resolved_model] = self.get_model_details(resolved_model)
+        return resolved_model
+
+    @staticmethod
+    def _is_model_unavailable_error(e: Exception) -> bool:
+        """Returns True if the exception reports that the requested model does not exist (HTTP 404)."""
+        return isinstance(e, google_exceptions.NotFound) or getattr(e, 'status_code', None) == 404
 
-    def _validate_token_config(self, token_config: Dict[str, Any], model_name: str) -> Dict[str, Any]:
+    def invalidate_model_caches(self) -> None:
+        """
+        Forgets the model catalogue, model details and resolved model names, so
+        the next lookup fetches the catalogue again.
+        """
+        _cached_list_models.cache_clear()
+        _content_model_names.cache_clear()
+        _content_model_name_set.cache_clear()
+        _model_capabilities.cache_clear()
+        self._available_model_cache.clear()
+        self._resolved_capabilities.clear()
+
+    def _validate_token_config(self, token_config: Dict[str, Any], model_name: str,
+                               capabilities: Optional[ModelCapabilities] = None) -> Dict[str, Any]:
         """
         Validates and adjusts token configuration parameters (temperature, top_p, etc.)
         against the capabilities of the specified model.
@@ -250,49 +978,35 @@ class CommonGeminiTools:
         Args:
             token_config: The user-provided token configuration.
             model_name: The name of the model to validate against.
+            capabilities: The model's capabilities, if already known; looked up otherwise.
 
         Returns:
             A dictionary with validated and potentially adjusted token configurations.
         """
-        model_capabilities = self.get_model_details(model_name)
-        validated_config = token_config.copy()
-
-        max_temp = model_capabilities.get("max_temperature", 2.0)
-        if "temperature" in validated_config:
-            if validated_config["temperature"] > max_temp:
-                logger.warning(f"Temperature {validated_config['temperature']} exceeds model maximum {max_temp}, adjusting to {max_temp}")
-                validated_config["temperature"] = max_temp
-            elif validated_config["temperature"] < 0:
-                 logger.warning(f"Temperature {validated_config['temperature']} is below 0, adjusting to 0")
-                 validated_config["temperature"] = 0.0
-
-        model_max_tokens = model_capabilities.get("max_output_tokens", 4096)
-        if "max_output_tokens" in validated_config:
-            if validated_config["max_output_tokens"] > model_max_tokens:
-                logger.warning(f"max_output_tokens {validated_config['max_output_tokens']} exceeds model limit {model_max_tokens}, adjusting.")
-                validated_config["max_output_tokens"] = model_max_tokens
-            elif validated_config["max_output_tokens"] <=0:
-                logger.warning(f"max_output_tokens {validated_config['max_output_tokens']} must be positive, adjusting to {model_max_tokens}.")
-                validated_config["max_output_tokens"] = model_max_tokens
-
-        model_top_p = model_capabilities.get("top_p", 0.95)
-        if "top_p" in validated_config:
-            if not (0 <= validated_config["top_p"] <= 1):
-                logger.warning(f"top_p {validated_config['top_p']} is outside valid range [0,1], adjusting to model default {model_top_p}")
-                validated_config["top_p"] = model_top_p
-        
-        model_top_k = model_capabilities.get("top_k", 40)
-        if "top_k" in validated_config:
-            if validated_config["top_k"] <= 0:
-                logger.warning(f"top_k {validated_config['top_k']} must be positive, adjusting to model default {model_top_k}")
-                validated_config["top_k"] = model_top_k
+        caps = capabilities or self.get_model_details(model_name)
+        validated_config = {k: token_config[k] for k in token_config.keys() & _GEMINI_SETTING_KEYS}
+
+        for field, lower, upper, replacement in _FIELD_BOUNDS:
+            if field not in validated_config:
+                continue
+            value = validated_config[field]
+            if isinstance(upper, str):
+                upper = getattr(caps, upper)
+            if lower <= value and (upper is None or value <= upper):
+                continue
+            if replacement is not None:
+                adjusted = getattr(caps, replacement)
+            else:
+                adjusted = max(lower, value if upper is None else min(upper, value))
+            logger.warning("%s %s is outside the supported range for %s, adjusting to %s", field, value, model_name, adjusted)
+            validated_config[field] = adjusted
         
         return validated_config
 
     def create_pydantic_agent(self, model_name: str, token_config: Dict,
                               deps_type: Type[BaseModel], output_type: Type[BaseModel],
                               system_prompt_str: str,
-                              context_template_str: Optional[str] = None,
+                              context_template: Optional[Union[str, Template]] = None,
                               context_data_func: Optional[Callable[[RunContext], Dict[str, Any]]] = None) -> Agent:
         """
         Creates a pydantic-ai Agent configured with a Gemini model.
@@ -303,25 +1017,30 @@ class CommonGeminiTools:
             deps_type: The Pydantic model type for agent dependencies (input).
             output_type: The Pydantic model type for the agent's structured output.
             system_prompt_str: The base system prompt string for the agent.
-            context_template_str: Optional Jinja2 template string for dynamic context.
-                                  If provided, this template is rendered by `context_data_func`.
+            context_template: Optional Jinja2 template (source string or compiled template)
+                              for dynamic context. If provided, this template is rendered
+                              with the values returned by `context_data_func`.
             context_data_func: Optional callable that takes a RunContext and returns a dictionary
-                               of values to render `context_template_str`.
+                               of values to render `context_template`.
 
         Returns:
             A configured pydantic-ai Agent instance.
         """
         working_model = self.get_available_model(model_name)
-        logger.info(f"Creating agent with model: {working_model}")
+        logger.info("Creating agent with model: %s", working_model)
 
-        validated_token_config = self._validate_token_config(token_config, working_model)
+        validated_token_config = self._validate_token_config(
+            token_config, working_model, self._resolved_capabilities.get(working_model)
+        )
 
-        model_tools = []
-        if self.enable_search_grounding and ('1.5' in working_model or '2.' in working_model):
-            try:
-                logger.info("Search grounding is enabled; relying on model/pydantic-ai for its application.")
-            except Exception as e:
-                 logger.warning(f"Could not set up Google Search tool for pydantic-ai agent: {e}")
+        cache_key = (
+            working_model, frozenset(validated_token_config.items()), deps_type, output_type,
+            system_prompt_str, context_template, context_data_func,
+        )
+        cached_agent = _AGENT_CACHE.get(cache_key)
+        if cached_agent is not None:
+            logger.info("Reusing cached pydantic-ai agent for model: %s", working_model)
+            return cached_agent
 
         agent_kwargs = {
             "model": working_model,
@@ -332,40 +1051,77 @@ class CommonGeminiTools:
 
         try:
             model_settings_params = {
-                k: v for k, v in validated_token_config.items() if k in ["temperature", "top_p", "top_k", "max_output_tokens", "candidate_count"]
+                k: validated_token_config[k] for k in validated_token_config.keys() & _GEMINI_SETTING_KEYS
             }
             model_settings = GeminiModelSettings(**model_settings_params)
-            
-            if model_tools and hasattr(model_settings, 'tools'):
-                 model_settings.tools = model_tools
-                 logger.info("Added tools to GeminiModelSettings for pydantic-ai agent.")
-
             agent_kwargs["model_settings"] = model_settings
         except Exception as e:
-            logger.warning(f"Failed to create GeminiModelSettings: {str(e)}. Agent will use defaults.")
+            logger.warning("Failed to create GeminiModelSettings: %s. Agent will use defaults.", e)
 
-        logger.info(f"Creating pydantic-ai agent with model: {working_model}, system prompt length: {len(system_prompt_str)}")
+        logger.info("Creating pydantic-ai agent with model: %s, system prompt length: %s", working_model, len(system_prompt_str))
         content_agent = Agent(**agent_kwargs)
 
-        if context_template_str and context_data_func:
+        if context_template and context_data_func:
+            # Compile once here rather than on every system-prompt callback.
+            compiled_ctx_tmpl = (_compile_template(context_template)
+                                 if isinstance(context_template, str) else context_template)
+
             @content_agent.system_prompt
             def add_dynamic_context(ctx: RunContext) -> str:
                 """Renders the context template with data from context_data_func."""
                 context_values = context_data_func(ctx)
-                return Template(context_template_str).render(**context_values)
+                return compiled_ctx_tmpl.render(**context_values)
 
+        _AGENT_CACHE[cache_key] = content_agent
         return content_agent
 
 
+# Stack traces kept on ProjectOutput are cut to their last this-many characters;
+# the full traceback goes to the log.
+MAX_STACK_TRACE_CHARS = 4096
+
+
+def _format_traceback(exc: BaseException) -> Tuple[str, str]:
+    """
+    Formats an exception's traceback once, for both the log and ProjectOutput.
+
+    Args:
+        exc: The exception being handled.
+
+    Returns:
+        The traceback text and the same text cut to its last MAX_STACK_TRACE_CHARS
+        characters for storing as `stack_trace`.
+    """
+    # chain=False skips formatting the __cause__/__context__ exceptions.
+    text = ''.join(traceback.TracebackException.from_exception(exc).format(chain=False))
+    if len(text) > MAX_STACK_TRACE_CHARS:
+        return text, "...\n" + text[-MAX_STACK_TRACE_CHARS:]
+    return text, text
+
+
+def _project_context_data(ctx: RunContext[ProjectInfo]) -> Dict[str, Any]:
+    """Returns the values used to render the main content context template."""
+    return ctx.deps.model_dump(include={"project_name", "repo_org", "project_prompt"})
+
+
 class MainContentGenerator:
     """
     Generates the main project content, including README, best practices,
     suggested extensions, and documentation sources using a Gemini agent.
     """
+    DEFAULT_SYSTEM_PROMPT_PATH = os.path.join(template_dir, "content_agent_system_prompt.txt")
+    DEFAULT_CONTEXT_TEMPLATE_PATH = os.path.join(template_dir, "content_agent_project_context.j2")
+    # Used when the template files cannot be loaded.
+    FALLBACK_SYSTEM_PROMPT = "Generate project documentation."
+    FALLBACK_CONTEXT_TEMPLATE = "Project: {{ project_name }}"
+
     def __init__(self, common_tools: CommonGeminiTools, project_name: str, project_prompt_text: str,
                  repo_org: str, model_name: str, token_config: Dict[str, Any], 
                  system_prompt_template_path: Optional[str] = None, 
-                 context_template_path: Optional[str] = None):
+                 context_template_path: Optional[str] = None,
+                 rate_limiter: Optional[GeminiRateLimiter] = None,
+                 placeholders: Optional[Dict[str, str]] = None,
+                 fallback_model_name: Optional[str] = None):
         """
         Initializes MainContentGenerator.
 
@@ -378,138 +1134,366 @@ class MainContentGenerator:
             token_config: Token configuration for the Gemini model.
             system_prompt_template_path: Optional custom path to system prompt template.
             context_template_path: Optional custom path to context template.
+            rate_limiter: Limiter for Gemini requests. Defaults to the process-wide limiter.
+            placeholders: Mapping of placeholder variable names to their formatted
+                          placeholders (currently not deeply integrated).
+            fallback_model_name: Model to retry with, once, if `model_name` does not
+                                 return valid structured output.
         """
         self.common_tools = common_tools
+        self.rate_limiter = rate_limiter or _default_rate_limiter()
+        self.placeholders = placeholders or {}
         self.project_name = project_name
         self.project_prompt_text = project_prompt_text
         self.repo_org = repo_org
         self.model_name = model_name
+        self.fallback_model_name = fallback_model_name
         self.token_config = token_config
         
         try:
             # Use custom template paths if provided, otherwise fall back to defaults
-            system_template_file = system_prompt_template_path or os.path.join(template_dir, "content_agent_system_prompt.txt")
-            context_template_file = context_template_path or os.path.join(template_dir, "content_agent_project_context.j2")
+            system_template_file = system_prompt_template_path or self.DEFAULT_SYSTEM_PROMPT_PATH
+            context_template_file = context_template_path or self.DEFAULT_CONTEXT_TEMPLATE_PATH
             
-            logger.info(f"Using system prompt template: {system_template_file}")
-            logger.info(f"Using context template: {context_template_file}")
+            logger.info("Using system prompt template: %s", system_template_file)
+            logger.info("Using context template: %s", context_template_file)
             
-            with open(system_template_file, "r") as f:
-                self.system_prompt_template_str = f.read()
-            with open(context_template_file, "r") as f:
-                self.context_template_str = f.read()
+            self.system_prompt_template_str = _load_template_file(system_template_file)
+            self.context_template_str = _load_template_file(context_template_file)
+            self.context_template = _get_template(context_template_file)
         except Exception as e:
-            logger.error(f"Failed to load templates for MainContentGenerator: {e}")
-            self.system_prompt_template_str = "Generate project documentation."
-            self.context_template_str = "Project: {{ project_name }}"
-
-    def generate(self, placeholder_format: str,
-                 placeholder_vars: List[str]) -> ProjectOutput:
-        """
-        Generates the main project documentation.
-
-        Args:
-            placeholder_format: The format string for placeholders (currently not deeply integrated).
-            placeholder_vars: A list of variable names to be treated as placeholders (currently not deeply integrated).
+            logger.error("Failed to load templates for MainContentGenerator: %s", e)
+            self.system_prompt_template_str = self.FALLBACK_SYSTEM_PROMPT
+            self.context_template_str = self.FALLBACK_CONTEXT_TEMPLATE
+            self.context_template = _compile_template(self.context_template_str)
+
+    def _create_agent(self, model_name: str) -> Agent:
+        """Creates the pydantic-ai agent used for main content generation with `model_name`."""
+        return self.common_tools.create_pydantic_agent(
+            model_name=model_name,
+            token_config=self.token_config,
+            deps_type=ProjectInfo,
+            output_type=ProjectOutput,
+            system_prompt_str=self.system_prompt_template_str,
+            context_template=self.context_template,
+            context_data_func=_project_context_data
+        )
 
-        Returns:
-            A ProjectOutput Pydantic model containing the generated content.
-        """
-        logger.info(f"Generating main content for project '{self.project_name}'...")
-        project_info = ProjectInfo(
+    def _project_info(self) -> ProjectInfo:
+        """Builds the agent dependencies for this project."""
+        return ProjectInfo(
             project_name=self.project_name,
             repo_org=self.repo_org,
             project_prompt=self.project_prompt_text
         )
 
-        def project_context_data_func(ctx: RunContext[ProjectInfo]) -> Dict[str, Any]:
-            return {
-                "project_name": ctx.deps.project_name,
-                "repo_org": ctx.deps.repo_org,
-                "project_prompt": ctx.deps.project_prompt,
-            }
+    def _process_result(self, result: Any) -> ProjectOutput:
+        """Extracts the ProjectOutput from an agent run result."""
+        if result is None or not hasattr(result, 'output'):
+            raise ValueError("Main content agent returned None or no output.")
+        
+        output_data: ProjectOutput = result.output
+        try:
+            if hasattr(result, 'candidate') and result.candidate and \
+               hasattr(result.candidate, 'grounding_metadata') and result.candidate.grounding_metadata:
+                logger.info("Response included grounding metadata.")
+                output_data.grounding_sources = [{"uri": "example.com/source", "title": "Example Source"}] 
+                output_data.search_queries = ["example search query"]
+        except Exception as e:
+            logger.warning("Error extracting grounding metadata: %s", e)
+
+        return output_data
+
+    def _cache_key(self, model_name: str) -> Optional[str]:
+        """Returns the response cache key for this project and model, or None if caching is disabled."""
+        if not _response_cache_enabled():
+            return None
+        return _response_cache_key(
+            self._project_info(),
+            self.common_tools.get_available_model(model_name),
+            self.token_config,
+            self.system_prompt_template_str,
+            self.context_template_str,
+            self.placeholders
+        )
 
-        agent = self.common_tools.create_pydantic_agent(
-            model_name=self.model_name,
-            token_config=self.token_config,
-            deps_type=ProjectInfo,
-            output_type=ProjectOutput,
-            system_prompt_str=self.system_prompt_template_str,
-            context_template_str=self.context_template_str,
-            context_data_func=project_context_data_func
+    def _cached_output(self, cache_key: Optional[str]) -> Optional[ProjectOutput]:
+        """Returns a cached response for this project, if there is one."""
+        if cache_key is None:
+            return None
+        output_data = _read_cached_output(cache_key)
+        if output_data is not None:
+            logger.info("Using cached main content for '%s' (%s).", self.project_name, cache_key[:12])
+        return output_data
+
+    def _estimated_tokens(self) -> int:
+        """Roughly estimates the prompt size in tokens (about 4 characters per token) for rate limiting."""
+        context = self.context_template.render(**self._project_info().model_dump())
+        return (len(self.system_prompt_template_str) + len(context) + len(MAIN_CONTENT_PROMPT)) // 4
+
+    def _invalidate_on_model_error(self, e: Exception, model_name: str) -> bool:
+        """
+        Drops the cached model resolution if a request failed because the model
+        is unavailable, so a retry re-resolves it from a fresh catalogue.
+
+        Returns:
+            True if the request should be retried.
+        """
+        if not self.common_tools._is_model_unavailable_error(e):
+            return False
+        logger.warning("Model %s is unavailable (%s), refreshing the model catalogue and retrying.", model_name, e)
+        self.common_tools.invalidate_model_caches()
+        return True
+
+    def _fall_back_on_invalid_output(self, e: Exception, model_name: str) -> Optional[str]:
+        """
+        Picks the fallback model if a request to `model_name` failed because the
+        model did not return valid structured output.
+
+        Returns:
+            The fallback model name to retry with, or None if there is none.
+        """
+        if not self.fallback_model_name or self.fallback_model_name == model_name:
+            return None
+        if not isinstance(e, (ValidationError, UnexpectedModelBehavior)):
+            return None
+        logger.warning("Model %s returned invalid output (%s), retrying with %s.", model_name, e, self.fallback_model_name)
+        return self.fallback_model_name
+
+    def _retry_after_error(self, e: Exception, attempt: int, model_name: str) -> Optional[str]:
+        """Returns the model to retry a failed request with, or None if it should not be retried."""
+        if attempt == 0 and self._invalidate_on_model_error(e, model_name):
+            return model_name
+        return self._fall_back_on_invalid_output(e, model_name)
+
+    def _error_output(self, e: Exception) -> ProjectOutput:
+        """Builds an error-filled ProjectOutput for the exception currently being handled."""
+        full_trace, stack_trace = _format_traceback(e)
+        logger.error("Error running main content agent: %s\n%s", e, full_trace)
+        error_msg = str(e)
+        return ProjectOutput(
+            readme_content=f"# Error in Main Content Generation\n\nError: {error_msg}\n\n```\n{stack_trace}\n```",
+            best_practices=[], suggested_extensions=[], documentation_source=[],
+            copilot_instructions="", project_type="Unknown", programming_language="Unknown",
+            error=error_msg, stack_trace=stack_trace
         )
 
-        try:
-            logger.info(f"Running main content agent for '{self.project_name}'...")
-            result = agent.run_sync(
-                "Generate comprehensive documentation and project setup guidance with current best practices.",
-                deps=project_info
-            )
+    def _generation_steps(self) -> Generator[Agent, Tuple[Any, Optional[Exception]], ProjectOutput]:
+        """
+        Runs the response cache lookup, retries and error handling shared by
+        generate() and generate_async(), independent of how the agent is called.
+        Each agent to run is yielded, and the caller sends back the run's
+        (result, exception) pair.
 
-            if result is None or not hasattr(result, 'output'):
-                raise ValueError("Main content agent returned None or no output.")
-            
-            output_data: ProjectOutput = result.output
-            try:
-                if hasattr(result, 'candidate') and result.candidate and \
-                   hasattr(result.candidate, 'grounding_metadata') and result.candidate.grounding_metadata:
-                    logger.info("Response included grounding metadata.")
-                    output_data.grounding_sources = [{"uri": "example.com/source", "title": "Example Source"}] 
-                    output_data.search_queries = ["example search query"]
-            except Exception as e:
-                logger.warning(f"Error extracting grounding metadata: {e}")
+        Returns:
+            The generated, cached or error-filled ProjectOutput.
+        """
+        logger.info("Generating main content for project '%s'...", self.project_name)
+        # The fallback model only applies to this call; self.model_name stays as configured.
+        model_name = self.model_name
+        for attempt in range(3):
+            # Recomputed on every attempt, since a retry may resolve to a different model.
+            cache_key = self._cache_key(model_name)
+            cached_output = self._cached_output(cache_key)
+            if cached_output is not None:
+                return cached_output
+
+            logger.info("Running main content agent for '%s'...", self.project_name)
+            result, error = yield self._create_agent(model_name)
+            if error is None:
+                try:
+                    output_data = self._process_result(result)
+                except Exception as e:
+                    error = e
+                else:
+                    if cache_key is not None:
+                        _write_cached_output(cache_key, output_data)
+                    return output_data
+            retry_model_name = self._retry_after_error(error, attempt, model_name) if attempt < 2 else None
+            if retry_model_name is None:
+                return self._error_output(error)
+            model_name = retry_model_name
+
+    def generate(self) -> ProjectOutput:
+        """
+        Generates the main project documentation synchronously.
 
-            return output_data
+        Returns:
+            A ProjectOutput Pydantic model containing the generated content.
+        """
+        steps = self._generation_steps()
+        try:
+            agent = next(steps)
+            while True:
+                try:
+                    with self.rate_limiter.limit(self._estimated_tokens()):
+                        result = self.common_tools._gemini_call_with_backoff(
+                            agent.run_sync,
+                            MAIN_CONTENT_PROMPT,
+                            deps=self._project_info()
+                        )
+                    outcome = (result, None)
+                except Exception as e:
+                    outcome = (None, e)
+                agent = steps.send(outcome)
+        except StopIteration as done:
+            return done.value
+
+    async def generate_async(self) -> ProjectOutput:
+        """
+        Generates the main project documentation using the agent's async API, so
+        it can run alongside other coroutines on an event loop.
 
-        except Exception as e:
-            logger.error(f"Error running main content agent: {str(e)}")
-            error_msg = str(e)
-            stack_trace = traceback.format_exc()
-            logger.error(stack_trace)
-            return ProjectOutput(
-                readme_content=f"# Error in Main Content Generation\n\nError: {error_msg}\n\n```\n{stack_trace}\n```",
-                best_practices=[], suggested_extensions=[], documentation_source=[],
-                copilot_instructions="", project_type="Unknown", programming_language="Unknown",
-                error=error_msg, stack_trace=stack_trace
-            )
+        Returns:
+            A ProjectOutput Pydantic model containing the generated content.
+        """
+        steps = self._generation_steps()
+        try:
+            agent = next(steps)
+            while True:
+                try:
+                    async with self.rate_limiter.limit_async(self._estimated_tokens()):
+                        result = await self.common_tools._gemini_call_with_backoff_async(
+                            agent.run,
+                            MAIN_CONTENT_PROMPT,
+                            deps=self._project_info()
+                        )
+                    outcome = (result, None)
+                except Exception as e:
+                    outcome = (None, e)
+                agent = steps.send(outcome)
+        except StopIteration as done:
+            return done.value
 
 
 class OutputFileWriter:
     """
     Handles writing the main generated content to a markdown file.
     """
-    def __init__(self, args: argparse.Namespace, main_markdown_template: Template):
+    def __init__(self, args: argparse.Namespace,
+                 main_markdown_template: Union[Template, str] = _MAIN_TEMPLATE_PATH):
+        """
+        Initializes OutputFileWriter.
+
+        Args:
+            args: Parsed command line arguments holding the output paths.
+            main_markdown_template: The markdown output template, or the path of a
+                                    template file to load the first time it is needed.
+        """
         self.args = args
-        self.main_markdown_template = main_markdown_template
-
-    def _write_file(self, output_arg_key: str, content: str, error_message: str):
-        original_file_path = getattr(self.args, output_arg_key, None)
-        if not original_file_path:
-            logger.info(f"Output path for '{output_arg_key}' not provided. Skipping.")
-            return
-        file_path = original_file_path
-        try:
-            directory = os.path.dirname(os.path.abspath(file_path))
-            try:
-                os.makedirs(directory, exist_ok=True)
-                logger.debug(f"Created or verified directory: {directory}")
-            except Exception as dir_err:
-                logger.error(f"Failed to create directory {directory}: {str(dir_err)}")
-                raise
-            with open(file_path, 'w', encoding='utf-8') as f:
+        # Output paths, snapshotted once so the write path doesn't go back to the Namespace.
+        self.paths: Dict[str, Optional[str]] = {key: getattr(args, key, None) for key in self.PATH_ARG_KEYS}
+        self._main_markdown_template = main_markdown_template
+        # Set once error content has been written, so repeated error paths in one run don't rewrite it.
+        self._wrote_error = False
+        # The bundled template can be built directly, without a Jinja2 render.
+        self._direct_markdown = (isinstance(main_markdown_template, str)
+                                 and os.path.abspath(main_markdown_template) == _MAIN_TEMPLATE_PATH)
+
+    @property
+    def main_markdown_template(self) -> Template:
+        """The markdown output template, loaded through the shared template cache on first use."""
+        return self.load_template()
+
+    def load_template(self) -> Template:
+        """
+        Loads the markdown output template if it has not been loaded yet.
+
+        Returns:
+            The compiled template.
+
+        Raises:
+            Exception: If the template file is missing or does not compile.
+        """
+        if isinstance(self._main_markdown_template, str):
+            self._main_markdown_template = _get_template(self._main_markdown_template)
+        return self._main_markdown_template
+
+    def _output_path(self, output_arg_key: str) -> Optional[str]:
+        """
+        Looks up the path configured for an output.
+
+        Args:
+            output_arg_key: Name of the command line argument holding the path.
+
+        Returns:
+            The output path, or None if the output was not requested.
+        """
+        file_path = self.paths.get(output_arg_key)
+        if not file_path:
+            logger.info("Output path for '%s' not provided. Skipping.", output_arg_key)
+            return None
+        return file_path
+
+    @staticmethod
+    def _store_file(file_path: str, content: Union[str, bytes, TemplateStream]) -> int:
+        """
+        Atomically writes content to an output file, creating its parent directory.
+        Does no logging, so it can also run on the output write pool.
+
+        Args:
+            file_path: The output file path.
+            content: The file content; a template stream is rendered straight into the file.
+
+        Returns:
+            The number of bytes written.
+        """
+        # Checked on every write rather than memoized: the directory may have been
+        # removed since an earlier write in the same process.
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with _atomic_open(file_path) as f:
+            if isinstance(content, bytes):
                 f.write(content)
-            file_size = os.path.getsize(file_path)
-            file_size_str = f"{file_size / 1024:.1f} KB" if file_size > 1024 else f"{file_size} bytes"
-            logger.info(f"Successfully wrote {file_size_str} to {file_path}")
+            elif isinstance(content, str):
+                f.write(content.encode('utf-8'))
+            else:
+                # Rendered chunks go straight to the file without building the full string.
+                content.dump(f, encoding='utf-8')
+            return f.tell()
+
+    @staticmethod
+    def _log_written(file_path: str, file_size: int):
+        file_size_str = f"{file_size / 1024:.1f} KB" if file_size > 1024 else f"{file_size} bytes"
+        logger.info("Successfully wrote %s to %s", file_size_str, file_path)
+
+    def _write_file(self, file_path: Optional[str], content: Union[str, bytes, TemplateStream],
+                    error_message: str) -> bool:
+        """
+        Writes one output file, logging the outcome.
+
+        Returns:
+            False if the write failed, True otherwise (including when no path is set).
+        """
+        if not file_path:
+            return True
+        try:
+            self._log_written(file_path, self._store_file(file_path, content))
+            return True
         except Exception as e:
-            logger.error(f"{error_message} for {file_path}: {str(e)}")
+            logger.error("%s for %s: %s", error_message, file_path, e)
+            return False
 
-    def _convert_project_output_to_markdown(self, project_output: ProjectOutput) -> str:
-        if hasattr(project_output, 'model_dump') and callable(getattr(project_output, 'model_dump')):
-            model_dict = project_output.model_dump()
+    # Command line arguments holding output file paths.
+    PATH_ARG_KEYS = ("json_output", "markdown_output", "project_prompt_output",
+                     "github_project_prompt_output", "copilot_instructions_output")
+
+    # Outputs written by this class.
+    OUTPUT_ARG_KEYS = ("json_output", "markdown_output")
+
+    # ProjectOutput fields used by the markdown template.
+    MARKDOWN_FIELDS = ("readme_content", "best_practices", "suggested_extensions",
+                       "documentation_source", "copilot_instructions")
+
+    def _markdown_template_data(self, project_output: ProjectOutput,
+                                model_dict: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if model_dict is not None or isinstance(project_output, ProjectOutput):
+            if model_dict is not None:
+                data_for_template = {k: model_dict[k] for k in self.MARKDOWN_FIELDS}
+            else:
+                data_for_template = project_output.model_dump(include=set(self.MARKDOWN_FIELDS))
             
             # Clean up readme_content to remove markdown code block markers if present
-            readme_content = model_dict.get("readme_content", "No content available")
+            readme_content = data_for_template.get("readme_content", "No content available")
             # Remove opening ```markdown if present
             if readme_content.startswith("```markdown"):
                 readme_content = readme_content[len("```markdown"):].lstrip()
@@ -519,30 +1503,169 @@ class OutputFileWriter:
             # Remove closing ``` if it appears at the end
             if readme_content.endswith("```"):
                 readme_content = readme_content[:-3].rstrip()
-                
-            data_for_template = {
-                "readme_content": readme_content,
-                "best_practices": model_dict.get("best_practices", []),
-                "suggested_extensions": model_dict.get("suggested_extensions", []),
-                "documentation_source": model_dict.get("documentation_source", []),
-                "copilot_instructions": model_dict.get("copilot_instructions"),
-            }
+            data_for_template["readme_content"] = readme_content
         else:
             data_for_template = {"readme_content": "Invalid project output format for Markdown."}
+        return data_for_template
+
+    def _use_direct_markdown(self) -> bool:
+        """Whether the markdown output can skip Jinja2 and use _build_project_markdown."""
+        return self._direct_markdown and _markdown_template_is_trivial()
+
+    def _convert_project_output_to_markdown(self, project_output: ProjectOutput) -> str:
+        data_for_template = self._markdown_template_data(project_output)
+        if self._use_direct_markdown():
+            return _build_project_markdown(data_for_template)
         return self.main_markdown_template.render(data_for_template)
 
-    def write_markdown_output(self, project_output: ProjectOutput):
-        logger.info("Writing main markdown output file...")
-        if hasattr(self.args, 'markdown_output') and self.args.markdown_output:
-            markdown_content = self._convert_project_output_to_markdown(project_output)
-            self._write_file('markdown_output', markdown_content, "Failed to write Markdown output")
+    def _markdown_content(self, project_output: ProjectOutput,
+                          model_dict: Optional[Dict[str, Any]] = None) -> Union[str, TemplateStream]:
+        """Builds the markdown output, as a template stream when it is rendered by Jinja2."""
+        data_for_template = self._markdown_template_data(project_output, model_dict)
+        if self._use_direct_markdown():
+            return _build_project_markdown(data_for_template)
+        if isinstance(self.main_markdown_template, Template):
+            return self.main_markdown_template.stream(data_for_template)
+        return self.main_markdown_template.render(data_for_template)
 
-    def write_error_markdown(self, error_msg: str, stack_trace: Optional[str] = None):
-        logger.error(f"Writing error markdown due to: {error_msg}")
-        error_content_md = f"# Error: Failed to Generate Content\n\n{error_msg}"
+    @staticmethod
+    def _json_content(project_output: ProjectOutput, model_dict: Optional[Dict[str, Any]] = None) -> bytes:
+        """Serializes the project output as indented JSON, with orjson when it is installed."""
+        if orjson is None and isinstance(project_output, ProjectOutput):
+            # Without orjson, pydantic-core's serializer is several times faster than json.dumps.
+            return project_output.model_dump_json(indent=2).encode('utf-8')
+        if model_dict is None:
+            model_dict = project_output.model_dump(mode='json')
+        if orjson is not None:
+            return orjson.dumps(model_dict, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(model_dict, indent=2).encode('utf-8')
+
+    @staticmethod
+    def _error_markdown_content(error_msg: str, stack_trace: Optional[str] = None) -> str:
+        parts = ["# Error: Failed to Generate Content\n\n", error_msg]
         if stack_trace:
-            error_content_md += f"\n\n## Stack Trace\n\n```\n{stack_trace}\n```"
-        self._write_file('markdown_output', error_content_md, "Failed to write error Markdown")
+            parts += ["\n\n## Stack Trace\n\n```\n", stack_trace, "\n```"]
+        return "".join(parts)
+
+    @staticmethod
+    def _error_json_content(error_msg: str, stack_trace: Optional[str] = None) -> Union[str, bytes]:
+        error_obj = {"error": error_msg, "stack_trace": stack_trace}
+        if orjson is not None:
+            return orjson.dumps(error_obj, option=orjson.OPT_INDENT_2)
+        return json.dumps(error_obj, indent=2)
+
+    def write_markdown_output(self, project_output: ProjectOutput, model_dict: Optional[Dict[str, Any]] = None) -> bool:
+        logger.info("Writing main markdown output file...")
+        file_path = self.paths['markdown_output']
+        if not file_path:
+            return True
+        return self._write_file(file_path, self._markdown_content(project_output, model_dict),
+                                "Failed to write Markdown output")
+
+    def write_error_markdown(self, error_msg: str, stack_trace: Optional[str] = None) -> bool:
+        logger.error("Writing error markdown due to: %s", error_msg)
+        file_path = self._output_path('markdown_output')
+        if not file_path:
+            return True
+        return self._write_file(file_path, self._error_markdown_content(error_msg, stack_trace),
+                                "Failed to write error Markdown")
+
+    def write_all_outputs(self, project_output: ProjectOutput) -> bool:
+        """
+        Writes every requested output file for successfully generated content.
+
+        Returns:
+            True if every requested file was written.
+        """
+        # Successful output supersedes any error content written earlier in the run.
+        self._wrote_error = False
+        if not any(self.paths[key] for key in self.OUTPUT_ARG_KEYS):
+            logger.info("No output paths provided. Skipping output files.")
+            return True
+        # Dump the model once and share it between the JSON and markdown outputs.
+        model_dict = project_output.model_dump(mode='json')
+        logger.info("Writing JSON and markdown output files...")
+        return self._run_writes(
+            ('json_output', lambda: self._json_content(project_output, model_dict),
+             "Failed to write JSON output"),
+            ('markdown_output', lambda: self._markdown_content(project_output, model_dict),
+             "Failed to write Markdown output"),
+        )
+
+    def write_error_outputs(self, error_msg: str, stack_trace: Optional[str] = None) -> bool:
+        """
+        Writes error information to every requested output file. Only the first
+        error reported in a run is written; later calls are skipped until
+        write_all_outputs replaces the error content.
+
+        Returns:
+            True if every requested file was written (or already had been).
+        """
+        if self._wrote_error:
+            logger.info("Error outputs already written; skipping error: %s", error_msg)
+            return True
+        logger.error("Writing error outputs due to: %s", error_msg)
+        written = self._run_writes(
+            ('markdown_output', lambda: self._error_markdown_content(error_msg, stack_trace),
+             "Failed to write error Markdown"),
+            ('json_output', lambda: self._error_json_content(error_msg, stack_trace),
+             "Failed to write error JSON"),
+        )
+        self._wrote_error = written
+        return written
+
+    def _run_writes(self, *writes: Tuple[str, Callable[[], Union[str, bytes, TemplateStream]], str]) -> bool:
+        """
+        Writes independent output files on the shared output write pool so their
+        file I/O overlaps, using the same _store_file as _write_file. Content is
+        built on the calling thread, and once every write has finished the results
+        are logged here in submission order.
+
+        Args:
+            *writes: (output argument key, content builder, error message) for each file.
+
+        Returns:
+            True if every file was written, False if any write failed.
+        """
+        submitted = []
+        for output_arg_key, build_content, error_message in writes:
+            file_path = self._output_path(output_arg_key)
+            if not file_path:
+                continue
+            try:
+                content = build_content()
+            except Exception as e:
+                submitted.append((file_path, error_message, e))
+            else:
+                submitted.append((file_path, error_message,
+                                  _output_write_executor().submit(self._store_file, file_path, content)))
+
+        wait_for_futures([outcome for _, _, outcome in submitted if isinstance(outcome, Future)])
+        failed = 0
+        for file_path, error_message, outcome in submitted:
+            error = outcome if isinstance(outcome, Exception) else outcome.exception()
+            if error is not None:
+                failed += 1
+                logger.error("%s for %s: %s", error_message, file_path, error)
+            else:
+                self._log_written(file_path, outcome.result())
+        return failed == 0
+
+
+@functools.lru_cache(maxsize=8)
+def _build_placeholders(placeholder_format: str, placeholder_vars: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Formats each placeholder variable with the placeholder format, once per
+    distinct format and variable list.
+
+    Args:
+        placeholder_format: Format string for placeholders, e.g. '${%s}'.
+        placeholder_vars: Placeholder variable names.
+
+    Returns:
+        (variable name, formatted placeholder) pairs, in the order given.
+    """
+    return tuple((v, placeholder_format % v) for v in placeholder_vars)
 
 
 class ProjectPrompt:
@@ -555,7 +1678,7 @@ class ProjectPrompt:
                  project_prompt_text: str,
                  repo_org: str,
                  gemini_api_key: str,
-                 main_gemini_model: str = 'gemini-1.5-pro-latest',
+                 main_gemini_model: str = 'gemini-1.5-flash-latest',
                  copilot_gemini_model: str = 'gemini-1.5-flash-latest',
                  token_config_overrides: Optional[Dict[str, Any]] = None,
                  enable_search_grounding: bool = True,
@@ -563,7 +1686,10 @@ class ProjectPrompt:
                  placeholder_vars_list: Optional[List[str]] = None,
                  project_prompt_formatter_template_path: Optional[str] = None,
                  system_prompt_template_path: Optional[str] = None,
-                 context_template_path: Optional[str] = None
+                 context_template_path: Optional[str] = None,
+                 run_async: bool = False,
+                 max_concurrent_requests: Optional[int] = None,
+                 fallback_gemini_model: Optional[str] = 'gemini-1.5-pro-latest'
                  ):
         """
         Initializes the ProjectPrompt generator.
@@ -580,13 +1706,22 @@ class ProjectPrompt:
             placeholder_format: Format string for placeholders.
             placeholder_vars_list: List of placeholder variable names.
             project_prompt_formatter_template_path: Optional custom template path for ProjectPromptsFormatter.
+            run_async: Run generation on an asyncio event loop using the agents' async API.
+                       Defaults to the synchronous API.
+            max_concurrent_requests: Maximum number of Gemini requests in flight at once. If set, this instance
+                                     gets its own rate limiter; otherwise the process-wide limiter configured
+                                     by GEMINI_MAX_CONCURRENT, GEMINI_RPM and GEMINI_TPM is shared.
+            fallback_gemini_model: Model to retry main content generation with if `main_gemini_model`
+                                   returns invalid structured output. None disables the fallback.
         """
+        _configure_logging()
         self.project_name = project_name
         self.project_prompt_text = project_prompt_text
         self.repo_org = repo_org
         self.gemini_api_key = gemini_api_key
         self.main_gemini_model = main_gemini_model
         self.copilot_gemini_model = copilot_gemini_model
+        self.fallback_gemini_model = fallback_gemini_model
         self.token_config_overrides = token_config_overrides or {}
         self.enable_search_grounding = enable_search_grounding
         self.placeholder_format = placeholder_format
@@ -595,9 +1730,13 @@ class ProjectPrompt:
         # Store custom template paths for system prompt and context
         self.system_prompt_template_path = system_prompt_template_path
         self.context_template_path = context_template_path
+        self.run_async = run_async
+        self.rate_limiter = (GeminiRateLimiter(max_concurrent=max_concurrent_requests)
+                             if max_concurrent_requests else _default_rate_limiter())
 
         self._project_output_data: Optional[ProjectOutput] = None
         self._initialization_success = False
+        self._warned_on_access = False
         
         try:
             self.common_tools = CommonGeminiTools(
@@ -611,9 +1750,8 @@ class ProjectPrompt:
             self._generate_all_content()
             self._initialization_success = True
         except Exception as e:
-            logger.error(f"Error during ProjectPrompt initialization: {e}")
-            stack_trace = traceback.format_exc()
-            logger.error(f"Stack trace: {stack_trace}")
+            full_trace, stack_trace = _format_traceback(e)
+            logger.error("Error during ProjectPrompt initialization: %s\n%s", e, full_trace)
             
             # Create a minimal error output so that properties don't return None
             error_msg = f"ProjectPrompt initialization failed: {str(e)}"
@@ -630,28 +1768,37 @@ class ProjectPrompt:
     def _initialize_generators(self):
         base_token_config = {
             "temperature": 0.2, "top_p": 0.95, "top_k": 40,
-            "max_output_tokens": 16384, "candidate_count": 1
+            "max_output_tokens": DEFAULT_MAX_OUTPUT_TOKENS, "candidate_count": 1
         }
         base_token_config.update(self.token_config_overrides)
         
-        logger.info(f"Base token configurations for ProjectPrompt: {base_token_config}")
+        logger.info("Base token configurations for ProjectPrompt: %s", base_token_config)
 
         main_content_token_config = base_token_config.copy()
         copilot_token_config = base_token_config.copy()
 
+        self._placeholders = dict(_build_placeholders(self.placeholder_format, tuple(self.placeholder_vars_list)))
+
         # Initialize MainContentGenerator with custom template paths if provided
         self.main_generator = MainContentGenerator(
             self.common_tools, self.project_name, self.project_prompt_text, self.repo_org,
             self.main_gemini_model, main_content_token_config,
             system_prompt_template_path=self.system_prompt_template_path,
-            context_template_path=self.context_template_path
+            context_template_path=self.context_template_path,
+            rate_limiter=self.rate_limiter,
+            placeholders=self._placeholders,
+            fallback_model_name=self.fallback_gemini_model
         )
 
+    async def _generate_all_content_async(self):
+        self._project_output_data = await self.main_generator.generate_async()
+
     def _generate_all_content(self):
         logger.info("Starting content generation process within ProjectPrompt...")
-        self._project_output_data = self.main_generator.generate(
-            self.placeholder_format, self.placeholder_vars_list
-        )
+        if self.run_async:
+            asyncio.run(self._generate_all_content_async())
+        else:
+            self._project_output_data = self.main_generator.generate()
 
         if self._project_output_data.error or "Error in Main Content Generation" in self._project_output_data.readme_content:
             logger.error("Main content generation failed within ProjectPrompt.")
@@ -666,22 +1813,71 @@ class ProjectPrompt:
     @property
     def project_output_data(self) -> Optional[ProjectOutput]:
         """Returns the generated project output data or an error-filled object if initialization failed."""
-        if not self._initialization_success:
+        if not self._initialization_success and not self._warned_on_access:
+            self._warned_on_access = True
             logger.warning("Accessing project_output_data after failed initialization.")
         return self._project_output_data
 
+    def release_output_data(self) -> None:
+        """
+        Drops the reference to the generated output once it has been written,
+        so large generated content can be garbage collected while the instance
+        stays alive. project_output_data returns None afterwards.
+        """
+        self._project_output_data = None
+
+
+def _parse_bool_flag(value: str) -> bool:
+    """Converts a 'true'/'false' command line value to a bool."""
+    return value.lower() == 'true'
+
+
+def _parse_comma_list(value: str) -> List[str]:
+    """Splits a comma-separated command line value into a list."""
+    return value.split(',')
+
+
+class _ArgsFileParser(argparse.ArgumentParser):
+    """ArgumentParser that reads shell-style argument files given as @path."""
+
+    def convert_arg_line_to_args(self, arg_line: str) -> List[str]:
+        """
+        Splits one line of an argument file into arguments, honouring quotes
+        and skipping blank lines and # comments.
+
+        Args:
+            arg_line: A line read from the argument file.
+
+        Returns:
+            The arguments found on the line.
+        """
+        return shlex.split(arg_line, comments=True)
+
 
-def main():
-    parser = argparse.ArgumentParser(description='Generate project documentation using Gemini API')
+@functools.lru_cache(maxsize=None)
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the command line parser once per process.
+
+    Returns:
+        The configured ArgumentParser.
+    """
+    parser = _ArgsFileParser(
+        description='Generate project documentation using Gemini API',
+        fromfile_prefix_chars='@'
+    )
     parser.add_argument('--project_prompt', required=True, help='Project description')
     parser.add_argument('--repo_org', required=True, help='GitHub organization name')
     parser.add_argument('--project_name', required=True, help='Project name')
-    parser.add_argument('--gemini_model', default='gemini-1.5-pro-latest', help='Main Gemini model for content generation')
+    parser.add_argument('--gemini_model', default='gemini-1.5-flash-latest', help='Main Gemini model for content generation')
+    parser.add_argument('--fallback_gemini_model', default='gemini-1.5-pro-latest',
+                        help='Gemini model to retry with if the main model returns invalid structured output')
     parser.add_argument('--copilot_gemini_model', default='gemini-1.5-flash-latest', help='Gemini model for Copilot instructions')
     parser.add_argument('--markdown_output', required=True, help='Path for the output Markdown file')
-    parser.add_argument('--enable_search_grounding', type=str, default='true', help='Enable search grounding for supported models')
+    parser.add_argument('--json_output', help='Path for the output JSON file')
+    parser.add_argument('--enable_search_grounding', type=_parse_bool_flag, default=True, help='Enable search grounding for supported models')
     parser.add_argument('--placeholder_format', default='${%s}', help='Placeholder format string')
-    parser.add_argument('--placeholder_vars', default='project_name,repo_org,project_type,programming_language', 
+    parser.add_argument('--placeholder_vars', type=_parse_comma_list, default='project_name,repo_org,project_type,programming_language', 
                         help='Comma-separated list of placeholder variables')
     parser.add_argument('--temperature', type=float, help='Model temperature (overrides defaults)')
     parser.add_argument('--top_p', type=float, help='Model top_p (overrides defaults)')
@@ -689,7 +1885,7 @@ def main():
     parser.add_argument('--project_prompt_template', 
         type=str, 
         help='Path to the project prompt template file', 
-        default=os.path.join(template_dir, "project_prompt_template.j2"))
+        default=_MAIN_TEMPLATE_PATH)
     parser.add_argument('--max_output_tokens', type=int, help='Max output tokens (overrides defaults)')
     parser.add_argument('--output_dir', 
         type=str, 
@@ -698,47 +1894,66 @@ def main():
         action='store_true',
         help="When used with --output_dir, preserves relative path structure even for paths with parent directories"
     )
+    parser.add_argument('--run_async',
+        action='store_true',
+        help="Run content generation on an asyncio event loop with the agents' async API"
+    )
     # Custom template file arguments
     parser.add_argument('--system_prompt_template', type=str,
                         help='Path to a custom system prompt template file')
     parser.add_argument('--context_template', type=str,
                         help='Path to a custom context template file')
-    args = parser.parse_args()
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the command line workflow.
+
+    Args:
+        argv: Command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        The process exit code: 0 on success, 1 on failure.
+    """
+    _configure_logging()
+    args = _build_parser().parse_args(argv)
 
     if args.output_dir:
         try:
-            expanded_output_dir = os.path.expandvars(os.path.expanduser(args.output_dir))
+            expanded_output_dir = _expandvars_cached(os.path.expanduser(args.output_dir))
             args.output_dir = expanded_output_dir
             os.makedirs(args.output_dir, exist_ok=True)
-            logger.info(f"Output directory set to: {args.output_dir}")
+            logger.info("Output directory set to: %s", args.output_dir)
         except Exception as e:
-            logger.error(f"Failed to create output directory {args.output_dir}: {e}")
-            sys.exit(1)
-
-    main_markdown_template_content = ""
+            logger.error("Failed to create output directory %s: %s", args.output_dir, e)
+            return 1
+
+    # --project_prompt_template names the same file by default, so it is read and
+    # parsed once through the shared cache.
+    output_writer = OutputFileWriter(args, args.project_prompt_template or _MAIN_TEMPLATE_PATH)
+    # Load the template before any Gemini request, so a missing or broken template
+    # fails the run up front instead of after a billable generation.
     try:
-        with open(os.path.join(template_dir, "project_prompt_template.j2"), "r", encoding="utf-8") as f:
-            main_markdown_template_content = f.read()
+        output_writer.load_template()
     except Exception as e:
-        logger.error(f"Failed to load main markdown template (project_prompt_template.j2): {e}")
-        sys.exit(1)
-        
-    output_writer = OutputFileWriter(args, Template(main_markdown_template_content))
+        error_msg = f"Failed to load markdown template {args.project_prompt_template}: {e}"
+        logger.error(error_msg)
+        output_writer.write_error_outputs(error_msg)
+        return 1
 
     try:
-        api_key = os.getenv("GEMINI_API_KEY")
+        api_key = _env("GEMINI_API_KEY")
         if not api_key:
             logger.error("GEMINI_API_KEY environment variable not set.")
-            output_writer.write_error_markdown("GEMINI_API_KEY not set.")
-            sys.exit(1)
+            output_writer.write_error_outputs("GEMINI_API_KEY not set.")
+            return 1
 
         token_config_overrides = {}
         if args.temperature is not None: token_config_overrides["temperature"] = args.temperature
         if args.top_p is not None: token_config_overrides["top_p"] = args.top_p
         if args.top_k is not None: token_config_overrides["top_k"] = args.top_k
         if args.max_output_tokens is not None: token_config_overrides["max_output_tokens"] = args.max_output_tokens
-         
-        enable_search_grounding_flag = args.enable_search_grounding.lower() == 'true'
 
         project_prompt_instance = ProjectPrompt(
             project_name=args.project_name,
@@ -747,41 +1962,43 @@ def main():
             gemini_api_key=api_key,
             main_gemini_model=args.gemini_model,
             copilot_gemini_model=args.copilot_gemini_model,
+            fallback_gemini_model=args.fallback_gemini_model,
             token_config_overrides=token_config_overrides,
-            enable_search_grounding=enable_search_grounding_flag,
+            enable_search_grounding=args.enable_search_grounding,
             placeholder_format=args.placeholder_format,
-            placeholder_vars_list=args.placeholder_vars.split(','),
+            placeholder_vars_list=args.placeholder_vars,
             project_prompt_formatter_template_path=args.project_prompt_template,
             system_prompt_template_path=args.system_prompt_template,
-            context_template_path=args.context_template
+            context_template_path=args.context_template,
+            run_async=args.run_async
          )
 
         if not project_prompt_instance.initialization_success:
             err_msg = "Content generation failed during initialization."
             project_output = project_prompt_instance.project_output_data
-            output_writer.write_error_markdown(
-                err_msg,
-                project_output.stack_trace if project_output and hasattr(project_output, 'stack_trace') else None
-            )
-            sys.exit(1)
+            output_writer.write_error_outputs(err_msg, getattr(project_output, 'stack_trace', None))
+            return 1
             
         project_output = project_prompt_instance.project_output_data
         if not project_output or project_output.error:
-            error_msg = project_output.error if project_output and hasattr(project_output, 'error') else "Unknown error."
-            output_writer.write_error_markdown(error_msg, getattr(project_output, 'stack_trace', None))
-            sys.exit(1)
-
-        output_writer.write_markdown_output(project_output)
+            error_msg = getattr(project_output, 'error', None) or "Unknown error."
+            output_writer.write_error_outputs(error_msg, getattr(project_output, 'stack_trace', None))
+            return 1
+
+        written = output_writer.write_all_outputs(project_output)
+        project_prompt_instance.release_output_data()
+        if not written:
+            logger.error("Content was generated but one or more output files could not be written.")
+            return 1
         logger.info("Content generation and file writing completed successfully.")
-        sys.exit(0)
+        return 0
 
     except Exception as e:
-        stack_trace = traceback.format_exc()
+        full_trace, stack_trace = _format_traceback(e)
         error_msg = f"Unhandled exception in main: {str(e)}"
-        logger.error(error_msg)
-        logger.error(f"Stack trace: {stack_trace}")
-        output_writer.write_error_markdown(error_msg, stack_trace)
-        sys.exit(1)
+        logger.error("%s\n%s", error_msg, full_trace)
+        output_writer.write_error_outputs(error_msg, stack_trace)
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -6,10 +6,7 @@ import logging
 import time
 from typing import Optional, List, Dict, Any
 
-import google.generativeai as genai
 from pydantic import BaseModel, Field, ValidationError
-from pydantic_ai import Agent, RunContext, ModelRetry
-from pydantic_ai.models.gemini import GeminiModelSettings
 
 class ReadmeContent(BaseModel):
     """Model for README.md content"""
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that gemini_generator.py reads command line arguments
+from @file argument files.
+"""
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gemini_generator import _build_parser
+
+failures = 0
+
+def check(condition, message):
+    """Print a pass/fail line and count failures"""
+    global failures
+    if condition:
+        print(f"✅ {message}")
+    else:
+        failures += 1
+        print(f"❌ {message}")
+
+def run_tests():
+    print("Testing @file argument files...")
+    test_dir = tempfile.mkdtemp(prefix="test_args_file_")
+    try:
+        args_file = os.path.join(test_dir, "args.txt")
+        with open(args_file, "w") as f:
+            f.write(
+                "# Arguments for the demo project\n"
+                "--project_name demo\n"
+                "\n"
+                "--project_prompt 'A Terraform module for  S3 buckets'  # trailing comment\n"
+                "--repo_org \"my org\"\n"
+                "--markdown_output out/output.md\n"
+                "--placeholder_vars project_name,repo_org\n"
+            )
+
+        args = _build_parser().parse_args([f"@{args_file}", "--temperature", "0.5"])
+        check(args.project_name == "demo", "Plain arguments are read from the file")
+        check(args.project_prompt == "A Terraform module for  S3 buckets", "Single-quoted values keep their spaces")
+        check(args.repo_org == "my org", "Double-quoted values keep their spaces")
+        check(args.markdown_output == "out/output.md", "Blank lines and comment lines are skipped")
+        check(args.placeholder_vars == ["project_name", "repo_org"], "File arguments go through their type converters")
+        check(args.temperature == 0.5, "Command line arguments are combined with the file")
+
+        args = _build_parser().parse_args([f"@{args_file}", "--project_name", "override"])
+        check(args.project_name == "override", "Later command line arguments override the file")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_tests()
+    sys.exit(1 if failures else 0)
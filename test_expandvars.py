@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that _expandvars_cached in gemini_generator.py expands
+--output_dir the same way os.path.expandvars does.
+"""
+import os
+import sys
+
+# The environment is memoized on first use, so the variables are set before the import.
+os.environ["TF_PROMPT_TEST_ROOT"] = "/srv/prompts"
+os.environ["TF_PROMPT_TEST_EMPTY"] = ""
+os.environ.pop("TF_PROMPT_TEST_UNSET", None)
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gemini_generator import _expandvars_cached
+
+failures = 0
+
+def check(condition, message):
+    """Print a pass/fail line and count failures"""
+    global failures
+    if condition:
+        print(f"✅ {message}")
+    else:
+        failures += 1
+        print(f"❌ {message}")
+
+def run_tests():
+    print("Testing _expandvars_cached...")
+    cases = [
+        "$TF_PROMPT_TEST_ROOT/output",
+        "${TF_PROMPT_TEST_ROOT}/output",
+        "prefix-${TF_PROMPT_TEST_ROOT}-suffix",
+        "$TF_PROMPT_TEST_UNSET/output",
+        "${TF_PROMPT_TEST_UNSET}/output",
+        "$TF_PROMPT_TEST_EMPTY/output",
+        "$TF_PROMPT_TEST_ROOT/$TF_PROMPT_TEST_ROOT",
+        "no variables here",
+        "trailing $",
+    ]
+    for value in cases:
+        expected = os.path.expandvars(value)
+        actual = _expandvars_cached(value)
+        check(actual == expected, f"{value!r} expands to {actual!r} (os.path.expandvars: {expected!r})")
+
+if __name__ == "__main__":
+    run_tests()
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the retry and model fallback flow of MainContentGenerator,
+through both the synchronous generate() and the asyncio generate_async() drivers.
+Agents are replaced with scripted fakes, so no Gemini requests are made.
+"""
+import os
+import sys
+import asyncio
+
+# The environment is memoized on first use, so the variable is set before the import.
+os.environ["GEMINI_CACHE_DISABLE"] = "1"
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import gemini_generator
+from gemini_generator import CommonGeminiTools, MainContentGenerator, GeminiRateLimiter, _build_parser
+from models import ProjectOutput
+
+MAIN_MODEL = "gemini-1.5-flash-latest"
+FALLBACK_MODEL = "gemini-1.5-pro-latest"
+
+failures = 0
+
+def check(condition, message):
+    """Print a pass/fail line and count failures"""
+    global failures
+    if condition:
+        print(f"✅ {message}")
+    else:
+        failures += 1
+        print(f"❌ {message}")
+
+def project_output(model_name):
+    return ProjectOutput(
+        readme_content=f"# Generated by {model_name}", best_practices=[], suggested_extensions=[],
+        documentation_source=[], copilot_instructions="", project_type="Terraform module",
+        programming_language="HCL"
+    )
+
+class FakeResult:
+    def __init__(self, output):
+        self.output = output
+
+class FakeAgent:
+    """Returns or raises the next scripted outcome for its model on each run"""
+    def __init__(self, tools, model_name):
+        self.tools = tools
+        self.model_name = model_name
+
+    def _next_outcome(self):
+        self.tools.calls.append(self.model_name)
+        outcome = self.tools.script[self.model_name].pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResult(outcome)
+
+    def run_sync(self, prompt, deps=None):
+        return self._next_outcome()
+
+    async def run(self, prompt, deps=None):
+        return self._next_outcome()
+
+class FakeGeminiTools(CommonGeminiTools):
+    """CommonGeminiTools that resolves every model to itself and hands out FakeAgents"""
+    def __init__(self, script):
+        super().__init__(enable_search_grounding=False)
+        self.script = script
+        self.calls = []
+        self.invalidations = 0
+
+    def get_available_model(self, requested_model='gemini-1.5-pro'):
+        return requested_model
+
+    def create_pydantic_agent(self, model_name, token_config, **kwargs):
+        return FakeAgent(self, model_name)
+
+    def invalidate_model_caches(self):
+        self.invalidations += 1
+
+def run_generator(driver, script, fallback_model_name=FALLBACK_MODEL):
+    tools = FakeGeminiTools(script)
+    generator = MainContentGenerator(
+        tools, "demo", "A Terraform module", "org", MAIN_MODEL, {"temperature": 0.2},
+        rate_limiter=GeminiRateLimiter(max_concurrent=1, rpm=0, tpm=0),
+        fallback_model_name=fallback_model_name
+    )
+    if driver == "async":
+        output = asyncio.run(generator.generate_async())
+    else:
+        output = generator.generate()
+    return generator, tools, output
+
+def test_driver(driver):
+    print(f"\n--- {driver} driver ---")
+    gemini_generator._load_gemini_sdk()
+    not_found = gemini_generator.google_exceptions.NotFound
+    invalid_output = gemini_generator.UnexpectedModelBehavior
+
+    _, tools, output = run_generator(driver, {MAIN_MODEL: [project_output(MAIN_MODEL)]})
+    check(output.error is None and tools.calls == [MAIN_MODEL], "A successful run makes one request")
+
+    _, tools, output = run_generator(driver, {MAIN_MODEL: [not_found("model gone"), project_output(MAIN_MODEL)]})
+    check(output.error is None and tools.calls == [MAIN_MODEL, MAIN_MODEL],
+          "An unavailable model is retried once with the same model")
+    check(tools.invalidations == 1, "The model catalogue is refreshed before that retry")
+
+    generator, tools, output = run_generator(driver, {
+        MAIN_MODEL: [invalid_output("bad structured output")],
+        FALLBACK_MODEL: [project_output(FALLBACK_MODEL)],
+    })
+    check(output.readme_content == f"# Generated by {FALLBACK_MODEL}" and tools.calls == [MAIN_MODEL, FALLBACK_MODEL],
+          "Invalid output is retried with the fallback model")
+    check(generator.model_name == MAIN_MODEL, "The fallback does not change the generator's model")
+
+    _, tools, output = run_generator(driver, {
+        MAIN_MODEL: [invalid_output("bad structured output")],
+        FALLBACK_MODEL: [invalid_output("still bad")],
+    })
+    check(output.error == "still bad" and tools.calls == [MAIN_MODEL, FALLBACK_MODEL],
+          "An error output is returned when the fallback model fails too")
+
+    _, tools, output = run_generator(driver, {MAIN_MODEL: [invalid_output("bad structured output")]},
+                                     fallback_model_name=None)
+    check(output.error == "bad structured output" and tools.calls == [MAIN_MODEL],
+          "Invalid output is not retried without a fallback model")
+
+    _, tools, output = run_generator(driver, {MAIN_MODEL: [ValueError("unexpected")]})
+    check(output.error == "unexpected" and output.stack_trace and tools.calls == [MAIN_MODEL],
+          "Other errors are not retried and produce an error output with a stack trace")
+
+def run_tests():
+    print("Testing MainContentGenerator retries and fallback...")
+    for driver in ("sync", "async"):
+        test_driver(driver)
+
+    print("\n--- --run_async flag ---")
+    base_args = ["--project_name", "demo", "--project_prompt", "p", "--repo_org", "o", "--markdown_output", "o.md"]
+    check(_build_parser().parse_args(base_args).run_async is False, "Generation runs synchronously by default")
+    check(_build_parser().parse_args(base_args + ["--run_async"]).run_async is True, "--run_async selects the async driver")
+
+if __name__ == "__main__":
+    run_tests()
+    sys.exit(1 if failures else 0)
@@ -80,11 +80,11 @@ def run_tests():
     
     # Test _write_file method with output_dir
     print("\nTesting _write_file with output_dir")
-    writer_with_dir._write_file('json_output', '{"test": "content"}', "Failed to write test JSON")
-    writer_with_dir._write_file('markdown_output', '# Test Markdown', "Failed to write test Markdown")
-    writer_with_dir._write_file('project_prompt_output', '# Test Project Prompt', "Failed to write test project prompt")
-    writer_with_dir._write_file('github_project_prompt_output', '# Test GitHub Project Prompt', "Failed to write test GitHub project prompt")
-    writer_with_dir._write_file('copilot_instructions_output', '# Test Copilot Instructions', "Failed to write test Copilot instructions")
+    writer_with_dir._write_file(writer_with_dir.paths['json_output'], '{"test": "content"}', "Failed to write test JSON")
+    writer_with_dir._write_file(writer_with_dir.paths['markdown_output'], '# Test Markdown', "Failed to write test Markdown")
+    writer_with_dir._write_file(writer_with_dir.paths['project_prompt_output'], '# Test Project Prompt', "Failed to write test project prompt")
+    writer_with_dir._write_file(writer_with_dir.paths['github_project_prompt_output'], '# Test GitHub Project Prompt', "Failed to write test GitHub project prompt")
+    writer_with_dir._write_file(writer_with_dir.paths['copilot_instructions_output'], '# Test Copilot Instructions', "Failed to write test Copilot instructions")
     
     # Clean up the output directory and test again with realistic paths
     print("\nTesting with realistic paths from logs")
@@ -100,11 +100,11 @@ def run_tests():
     realistic_writer = OutputFileWriter(realistic_args, MockTemplate())
     
     print("\nTesting _write_file with realistic paths")
-    realistic_writer._write_file('json_output', '{"test": "realistic content"}', "Failed to write test JSON")
-    realistic_writer._write_file('markdown_output', '# Test Realistic Markdown', "Failed to write test Markdown")
-    realistic_writer._write_file('project_prompt_output', '# Test Realistic Project Prompt', "Failed to write test project prompt")
-    realistic_writer._write_file('github_project_prompt_output', '# Test Realistic GitHub Project Prompt', "Failed to write test GitHub project prompt") 
-    realistic_writer._write_file('copilot_instructions_output', '# Test Realistic Copilot Instructions', "Failed to write test Copilot instructions")
+    realistic_writer._write_file(realistic_writer.paths['json_output'], '{"test": "realistic content"}', "Failed to write test JSON")
+    realistic_writer._write_file(realistic_writer.paths['markdown_output'], '# Test Realistic Markdown', "Failed to write test Markdown")
+    realistic_writer._write_file(realistic_writer.paths['project_prompt_output'], '# Test Realistic Project Prompt', "Failed to write test project prompt")
+    realistic_writer._write_file(realistic_writer.paths['github_project_prompt_output'], '# Test Realistic GitHub Project Prompt', "Failed to write test GitHub project prompt") 
+    realistic_writer._write_file(realistic_writer.paths['copilot_instructions_output'], '# Test Realistic Copilot Instructions', "Failed to write test Copilot instructions")
     
     # Verify the files were created in the output directory
     print("\nVerifying files in output directory:")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the wait times computed by GeminiRateLimiter._reserve
+and its handling of invalid concurrency limits.
+"""
+import os
+import sys
+import time
+
+# The environment is memoized on first use, so the variable is set before the import.
+os.environ["GEMINI_MAX_CONCURRENT"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gemini_generator import GeminiRateLimiter
+
+failures = 0
+
+def check(condition, message):
+    """Print a pass/fail line and count failures"""
+    global failures
+    if condition:
+        print(f"✅ {message}")
+    else:
+        failures += 1
+        print(f"❌ {message}")
+
+def fill_window(limiter, *entries):
+    """Record requests that started the given number of seconds ago with the given token costs"""
+    now = time.monotonic()
+    for age, tokens in entries:
+        limiter._window.append((now - age, tokens))
+        limiter._window_tokens += tokens
+
+def run_tests():
+    print("Testing GeminiRateLimiter._reserve...")
+
+    # No budgets: every request is recorded immediately.
+    limiter = GeminiRateLimiter(max_concurrent=1, rpm=0, tpm=0)
+    check(all(limiter._reserve(1000) == 0 for _ in range(100)), "Unlimited limiter never waits")
+
+    # RPM budget: the request waits until the oldest request leaves the window.
+    limiter = GeminiRateLimiter(max_concurrent=1, rpm=2, tpm=0)
+    check(limiter._reserve(0) == 0 and limiter._reserve(0) == 0, "Requests within the RPM budget are recorded")
+    wait = limiter._reserve(0)
+    check(59 < wait <= 60, f"Request over the RPM budget waits for the window to roll ({wait:.2f}s)")
+    check(len(limiter._window) == 2, "A request that has to wait is not recorded")
+
+    limiter = GeminiRateLimiter(max_concurrent=1, rpm=2, tpm=0)
+    fill_window(limiter, (50, 0), (10, 0))
+    wait = limiter._reserve(0)
+    check(9 < wait <= 10, f"Wait is measured from the oldest request in the window ({wait:.2f}s)")
+
+    # Requests older than the window are dropped before the budget is checked.
+    limiter = GeminiRateLimiter(max_concurrent=1, rpm=1, tpm=0)
+    fill_window(limiter, (61, 0))
+    check(limiter._reserve(0) == 0, "Requests older than the window no longer count")
+    check(len(limiter._window) == 1, "Expired requests are removed from the window")
+
+    # TPM budget: wait until enough of the oldest requests have left the window.
+    limiter = GeminiRateLimiter(max_concurrent=1, rpm=0, tpm=1000)
+    fill_window(limiter, (50, 400), (30, 400), (10, 100))
+    check(limiter._reserve(100) == 0, "Request within the TPM budget is recorded")
+    wait = limiter._reserve(300)
+    check(9 < wait <= 10, f"Request over the TPM budget waits for the oldest request to expire ({wait:.2f}s)")
+    wait = limiter._reserve(700)
+    check(29 < wait <= 30, f"Larger request waits until enough tokens are freed ({wait:.2f}s)")
+
+    # A request larger than the whole budget waits for an empty window.
+    limiter = GeminiRateLimiter(max_concurrent=1, rpm=0, tpm=1000)
+    fill_window(limiter, (50, 100), (20, 100))
+    wait = limiter._reserve(5000)
+    check(39 < wait <= 40, f"Request larger than the TPM budget waits for an empty window ({wait:.2f}s)")
+    limiter = GeminiRateLimiter(max_concurrent=1, rpm=0, tpm=1000)
+    check(limiter._reserve(5000) == 0, "Request larger than the TPM budget runs when the window is empty")
+
+    # With both budgets exceeded the longer wait wins.
+    limiter = GeminiRateLimiter(max_concurrent=1, rpm=2, tpm=1000)
+    fill_window(limiter, (50, 100), (5, 800))
+    wait = limiter._reserve(500)
+    check(54 < wait <= 55, f"The longer of the RPM and TPM waits is used ({wait:.2f}s)")
+
+    # Concurrency limits below 1 would make the semaphore block (or fail), so they fall back to the default.
+    print("\nTesting GeminiRateLimiter concurrency limits...")
+    check(GeminiRateLimiter().max_concurrent == 4, "GEMINI_MAX_CONCURRENT=0 falls back to 4")
+    check(GeminiRateLimiter(max_concurrent=0).max_concurrent == 4, "max_concurrent=0 falls back to 4")
+    check(GeminiRateLimiter(max_concurrent=-2).max_concurrent == 4, "A negative max_concurrent falls back to 4")
+    check(GeminiRateLimiter(max_concurrent=2).max_concurrent == 2, "A valid max_concurrent is kept")
+    with GeminiRateLimiter(max_concurrent=0).limit():
+        check(True, "A request slot can be acquired after falling back")
+
+if __name__ == "__main__":
+    run_tests()
+    sys.exit(1 if failures else 0)
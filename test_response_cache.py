@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the on-disk response cache in gemini_generator.py:
+hits, misses, TTL expiry, atomic writes and what goes into the cache key.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+# The cache location and TTL are read once, so they are set before the import.
+cache_dir = tempfile.mkdtemp(prefix="test_response_cache_")
+os.environ["GEMINI_CACHE_DIR"] = cache_dir
+os.environ["GEMINI_CACHE_TTL"] = "60"
+os.environ.pop("GEMINI_CACHE_DISABLE", None)
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import gemini_generator
+from gemini_generator import _response_cache_key, _read_cached_output, _write_cached_output
+from models import ProjectInfo, ProjectOutput
+
+failures = 0
+
+def check(condition, message):
+    """Print a pass/fail line and count failures"""
+    global failures
+    if condition:
+        print(f"✅ {message}")
+    else:
+        failures += 1
+        print(f"❌ {message}")
+
+def make_key(**overrides):
+    """Build a cache key from a fixed set of inputs, replacing any given ones"""
+    inputs = {
+        "project_info": ProjectInfo(project_name="demo", repo_org="org", project_prompt="A Terraform module"),
+        "model_name": "gemini-1.5-flash-latest",
+        "token_config": {"temperature": 0.2, "top_p": 0.95},
+        "system_prompt_str": "system prompt",
+        "context_template_str": "context {{ project_name }}",
+        "placeholders": {"project_name": "${project_name}"},
+    }
+    inputs.update(overrides)
+    return _response_cache_key(**inputs)
+
+def run_tests():
+    print("Testing the response cache...")
+    try:
+        check(str(gemini_generator._response_cache_dir()) == cache_dir, "GEMINI_CACHE_DIR sets the cache directory")
+
+        # Key contents
+        key = make_key()
+        check(key == make_key(), "Identical inputs give the same key")
+        check(key == make_key(token_config={"top_p": 0.95, "temperature": 0.2}), "Token config order does not change the key")
+        changed = {
+            "project": make_key(project_info=ProjectInfo(project_name="other", repo_org="org", project_prompt="A Terraform module")),
+            "model": make_key(model_name="gemini-1.5-pro-latest"),
+            "token config": make_key(token_config={"temperature": 0.5, "top_p": 0.95}),
+            "system prompt": make_key(system_prompt_str="another system prompt"),
+            "context template": make_key(context_template_str="another context"),
+            "placeholders": make_key(placeholders={"project_name": "{{project_name}}"}),
+        }
+        for name, other_key in changed.items():
+            check(other_key != key, f"Changing the {name} changes the key")
+        check(make_key(placeholders=None) == make_key(placeholders={}), "Missing placeholders hash like empty ones")
+
+        # Miss
+        check(_read_cached_output(key) is None, "Reading a key that was never written is a miss")
+
+        # Hit
+        output = ProjectOutput(
+            readme_content="# Demo", best_practices=["Pin provider versions"], suggested_extensions=[],
+            documentation_source=["https://developer.hashicorp.com/terraform"], copilot_instructions="Use HCL",
+            project_type="Terraform module", programming_language="HCL"
+        )
+        _write_cached_output(key, output)
+        check(_read_cached_output(key) == output, "A written entry is read back unchanged")
+
+        # Atomic write
+        leftovers = [name for name in os.listdir(cache_dir) if name != f"{key}.json"]
+        check(not leftovers, "Writing leaves only the cache entry behind")
+        updated = output.model_copy(update={"readme_content": "# Updated"})
+        _write_cached_output(key, updated)
+        check(_read_cached_output(key) == updated, "Rewriting an entry replaces it")
+        check(os.listdir(cache_dir) == [f"{key}.json"], "Rewriting leaves no temporary files behind")
+
+        # Unreadable entries are misses
+        corrupt_key = make_key(model_name="corrupt")
+        with open(os.path.join(cache_dir, f"{corrupt_key}.json"), "w") as f:
+            f.write("{not json")
+        check(_read_cached_output(corrupt_key) is None, "An unreadable entry is a miss")
+
+        # TTL expiry
+        entry = os.path.join(cache_dir, f"{key}.json")
+        old = time.time() - 30
+        os.utime(entry, (old, old))
+        check(_read_cached_output(key) == updated, "An entry younger than GEMINI_CACHE_TTL is a hit")
+        old = time.time() - 120
+        os.utime(entry, (old, old))
+        check(_read_cached_output(key) is None, "An entry older than GEMINI_CACHE_TTL is a miss")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_tests()
+    sys.exit(1 if failures else 0)